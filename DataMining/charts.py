@@ -0,0 +1,169 @@
+import hashlib
+import inspect
+import os
+import pickle
+import struct
+import time
+
+# Scatter inputs above this many points are downsampled before drawing (see downsample)
+MAX_SCATTER_POINTS = 20_000
+# PNG text chunk that stores the key a chart was drawn from
+KEY_FIELD = 'ChartKey'
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+class Chart:
+    """One PNG: a module-level draw function, its input data and the output path.
+
+    draw(**data) draws onto a new pyplot figure (it may create its own with plt.figure);
+    the renderer saves and closes it. The function must be importable by name so charts
+    can be drawn in worker processes.
+    """
+
+    def __init__(self, path, draw, **data):
+        self.path = path
+        self.draw = draw
+        self.data = data
+
+    def key(self):
+        """Hash of the inputs and of the draw function's source: equal keys, equal PNGs.
+
+        The module name is left out: it is '__main__' when a script runs directly and its
+        real name when imported (pipeline.py), and both runs should reuse the same PNGs.
+        """
+        digest = hashlib.sha256()
+        digest.update(self.draw.__qualname__.encode())
+        try:
+            digest.update(inspect.getsource(self.draw).encode())
+        except (OSError, TypeError):
+            pass
+        _hash_value(digest, self.data)
+        return digest.hexdigest()
+
+def _hash_value(digest, value):
+    """Feed a deterministic encoding of value (arrays, frames, containers, scalars) into digest."""
+    import numpy as np
+    if isinstance(value, dict):
+        digest.update(b'd%d' % len(value))
+        for k in sorted(value, key=str):
+            digest.update(str(k).encode())
+            _hash_value(digest, value[k])
+    elif isinstance(value, (list, tuple)):
+        digest.update(b'l%d' % len(value))
+        for item in value:
+            _hash_value(digest, item)
+    elif isinstance(value, np.ndarray) and value.dtype != object:
+        digest.update(f"a{value.dtype}{value.shape}".encode())
+        digest.update(np.ascontiguousarray(value).tobytes())
+    elif hasattr(value, 'to_numpy') and hasattr(value, 'index'):
+        # DataFrame / Series: values, labels and dtypes
+        import pandas as pd
+        if hasattr(value, 'columns'):
+            digest.update(repr((list(value.columns), list(value.dtypes))).encode())
+        else:
+            digest.update(repr((value.name, value.dtype)).encode())
+        digest.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+    elif value is None or isinstance(value, (str, int, float, bool, range)):
+        digest.update(repr(value).encode())
+    else:
+        # Anything else (e.g. a fitted estimator) by its pickle
+        digest.update(pickle.dumps(value, protocol=4))
+
+def stored_key(path):
+    """The KEY_FIELD text of a PNG written by render(), or None. Reads only the header chunks."""
+    try:
+        with open(path, 'rb') as f:
+            if f.read(8) != PNG_SIGNATURE:
+                return None
+            while True:
+                header = f.read(8)
+                if len(header) < 8:
+                    return None
+                length, kind = struct.unpack('>I4s', header)
+                if kind in (b'IDAT', b'IEND'):
+                    return None
+                body = f.read(length)
+                f.seek(4, os.SEEK_CUR) # CRC
+                if kind in (b'tEXt', b'iTXt'):
+                    keyword, _, text = body.partition(b'\0')
+                    if keyword.decode('latin-1') == KEY_FIELD:
+                        if kind == b'iTXt':
+                            # compression flag/method, language tag, translated keyword
+                            text = text[2:].split(b'\0', 2)[-1]
+                        return text.decode('utf-8')
+    except OSError:
+        return None
+
+def _draw(args):
+    """Draw one chart headless and save it with its key; runs in-process or in a worker."""
+    path, draw, data, key = args
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    start = time.perf_counter()
+    try:
+        draw(**data)
+        plt.savefig(path, metadata={KEY_FIELD: key})
+    finally:
+        plt.close('all')
+    return time.perf_counter() - start
+
+def render(charts, workers=None, force=False):
+    """Draw the charts whose PNG is missing or was drawn from other inputs.
+
+    A chart is skipped when the key stored in its PNG equals Chart.key(), so on a full
+    cache hit matplotlib is not even imported. With several charts to draw and workers
+    > 1 (default: one per CPU) they are drawn concurrently in a process pool.
+    Returns {path: 'cached' | 'drawn'}.
+    """
+    status, pending = {}, []
+    for chart in charts:
+        key = chart.key()
+        if not force and stored_key(chart.path) == key:
+            status[chart.path] = 'cached'
+        else:
+            pending.append((chart.path, chart.draw, chart.data, key))
+    workers = min(workers or os.cpu_count() or 1, len(pending))
+    if workers > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(_draw, pending))
+    else:
+        for job in pending:
+            _draw(job)
+    for job in pending:
+        status[job[0]] = 'drawn'
+    return status
+
+def report(status, names):
+    """Print one line per chart: saved, or unchanged and skipped."""
+    for path, name in names.items():
+        if status.get(path) == 'cached':
+            print(f"{name} unchanged, kept {os.path.basename(path)}")
+        else:
+            print(f"{name} saved to {os.path.basename(path)}")
+
+def downsample(*arrays, max_points=MAX_SCATTER_POINTS, strata=None, random_state=0):
+    """At most max_points rows of equally long arrays/DataFrames, the same rows from each.
+
+    Rows are drawn at random without replacement, in their original order. With strata
+    (one label per row) every label keeps its share of the rows, and at least one row.
+    Inputs within the limit are returned unchanged.
+    """
+    import numpy as np
+    n = len(arrays[0])
+    if max_points is None or n <= max_points:
+        return arrays if len(arrays) > 1 else arrays[0]
+    rng = np.random.default_rng(random_state)
+    if strata is None:
+        rows = rng.choice(n, size=max_points, replace=False)
+    else:
+        labels, codes = np.unique(np.asarray(strata), return_inverse=True)
+        rows = []
+        for code in range(len(labels)):
+            members = np.flatnonzero(codes == code)
+            take = max(1, round(len(members) * max_points / n))
+            rows.append(rng.choice(members, size=min(take, len(members)), replace=False))
+        rows = np.concatenate(rows)
+    rows = np.sort(rows)
+    picked = tuple(a.iloc[rows] if hasattr(a, 'iloc') else np.asarray(a)[rows] for a in arrays)
+    return picked if len(picked) > 1 else picked[0]
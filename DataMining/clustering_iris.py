@@ -1,68 +1,33 @@
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
 from sklearn.datasets import load_iris
 from sklearn.cluster import KMeans
 from sklearn.metrics import adjusted_rand_score
 from sklearn.preprocessing import MinMaxScaler
+import argparse
 import os
 
+from charts import Chart, downsample, render, report
+from k_selection import select_k
+
 # Define paths
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
-def perform_clustering():
-    print("--- 2. Data Clustering ---")
-    
-    # Load and Normalize Data (Re-using logic, or import if module structure allowed, ensuring standalone execution here)
-    iris = load_iris()
-    X = iris.data
-    y_true = iris.target
-    feature_names = iris.feature_names
-    
-    # Normalize for Clustering
-    scaler = MinMaxScaler()
-    X_scaled = scaler.fit_transform(X)
-    
-    # 2.1 K-Means with k=3
-    print("\nRunning K-Means (k=3)...")
-    kmeans = KMeans(n_clusters=3, random_state=42, n_init=10)
-    y_pred = kmeans.fit_predict(X_scaled)
-    
-    # Calculate ARI
-    ari = adjusted_rand_score(y_true, y_pred)
-    print(f"Adjusted Rand Index (ARI): {ari:.4f}")
-    
-    # 2.2 Experimentation (Elbow Method)
-    print("\nGenerating Elbow Curve...")
-    inertia = []
-    k_values = range(2, 11)
-    
-    for k in k_values:
-        km = KMeans(n_clusters=k, random_state=42, n_init=10)
-        km.fit(X_scaled)
-        inertia.append(km.inertia_)
-        
-    # Plot Elbow Curve
+def draw_elbow_curve(k_values, inertia):
+    import matplotlib.pyplot as plt
     plt.figure(figsize=(10, 6))
     plt.plot(k_values, inertia, marker='o')
     plt.title('Elbow Method for Optimal k')
     plt.xlabel('Number of Clusters (k)')
     plt.ylabel('Inertia')
     plt.grid(True)
-    plt.savefig(os.path.join(BASE_DIR, 'elbow_curve.png'))
-    plt.close()
-    print("Elbow curve saved to elbow_curve.png")
-    
-    # 2.3 Visualization (Scatter Plot)
-    print("\nVisualizing Clusters...")
+
+def draw_clusters_scatter(df_plot, feature_names, centroids):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
     # Using Petal Length (index 2) vs Petal Width (index 3)
     plt.figure(figsize=(10, 6))
     
-    # Create DataFrame for plotting
-    df_plot = pd.DataFrame(X_scaled, columns=feature_names)
-    df_plot['Cluster'] = y_pred
-    
     sns.scatterplot(
         data=df_plot, 
         x=feature_names[2], 
@@ -74,7 +39,6 @@ def perform_clustering():
     )
     
     # Plot Centroids
-    centroids = kmeans.cluster_centers_
     plt.scatter(
         centroids[:, 2], 
         centroids[:, 3], 
@@ -86,11 +50,63 @@ def perform_clustering():
     
     plt.title('K-Means Clusters (Petal Length vs Width)')
     plt.legend()
-    plt.savefig(os.path.join(BASE_DIR, 'clusters_scatter.png'))
-    plt.close()
-    print("Cluster visualization saved to clusters_scatter.png")
+
+def perform_clustering(workers=1, method='kmeans', sample_size=None, plot=True):
+    print("--- 2. Data Clustering ---")
+    
+    # Load and Normalize Data (Re-using logic, or import if module structure allowed, ensuring standalone execution here)
+    iris = load_iris()
+    X = iris.data
+    y_true = iris.target
+    feature_names = iris.feature_names
+    
+    # Normalize for Clustering
+    scaler = MinMaxScaler()
+    X_scaled = scaler.fit_transform(X)
+    
+    # 2.1 K-Means with k=3
+    print("\nRunning K-Means (k=3)...")
+    kmeans = KMeans(n_clusters=3, random_state=42, n_init=10)
+    y_pred = kmeans.fit_predict(X_scaled)
+    
+    # Calculate ARI
+    ari = adjusted_rand_score(y_true, y_pred)
+    print(f"Adjusted Rand Index (ARI): {ari:.4f}")
+    
+    # 2.2 Experimentation (Elbow Method)
+    print("\nGenerating Elbow Curve...")
+    k_values = range(2, 11)
+    # Same KMeans(n_init=10, random_state=42) per k, fitted in parallel (see k_selection.py)
+    scores = select_k(X_scaled, k_values, method=method, sample_size=sample_size, workers=workers)
+    inertia = scores['inertia'].tolist()
+    print(scores[['k', 'inertia', 'silhouette']].to_string(index=False))
+    if not plot:
+        return ari
+    
+    # 2.3 Visualization (Scatter Plot)
+    print("\nVisualizing Clusters...")
+    # Create DataFrame for plotting (downsampled per cluster above charts.MAX_SCATTER_POINTS)
+    df_plot = pd.DataFrame(X_scaled, columns=feature_names)
+    df_plot['Cluster'] = y_pred
+    df_plot = downsample(df_plot, strata=y_pred)
+    
+    # Both charts are skipped when their inputs are unchanged, else drawn concurrently
+    elbow_path = os.path.join(BASE_DIR, 'elbow_curve.png')
+    scatter_path = os.path.join(BASE_DIR, 'clusters_scatter.png')
+    status = render([
+        Chart(elbow_path, draw_elbow_curve, k_values=list(k_values), inertia=inertia),
+        Chart(scatter_path, draw_clusters_scatter, df_plot=df_plot, feature_names=list(feature_names),
+              centroids=kmeans.cluster_centers_),
+    ], workers=workers)
+    report(status, {elbow_path: "Elbow curve", scatter_path: "Cluster visualization"})
     
     return ari
 
 if __name__ == "__main__":
-    perform_clustering()
+    parser = argparse.ArgumentParser(description="K-Means clustering of the Iris dataset")
+    parser.add_argument('--workers', type=int, default=1, help="fit the elbow k values in this many processes (0 = one per CPU)")
+    parser.add_argument('--method', choices=['kmeans', 'minibatch'], default='kmeans')
+    parser.add_argument('--sample-size', type=int, help="fit each k on this many rows, then refine on all rows")
+    parser.add_argument('--no-plots', action='store_true', help="skip the elbow and scatter plots")
+    args = parser.parse_args()
+    perform_clustering(args.workers, args.method, args.sample_size, not args.no_plots)
@@ -0,0 +1,137 @@
+import pandas as pd
+import argparse
+import numpy as np
+import os
+import sqlite3
+import time
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.preprocessing import MinMaxScaler
+
+# Define paths
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DB_FILE = os.path.join(BASE_DIR, '..', 'DataWarehousing', 'retail_dw.db')
+
+# Customers per chunk in every pass; memory is bounded by this, not by the number of customers
+CHUNK_SIZE = 100_000
+
+FEATURES = ['recency', 'frequency', 'monetary']
+
+# Per-customer RFM, aggregated inside SQLite into a temp table (spilled to disk, not held in Python).
+# Recency is in days before the day after the last date in TimeDim (the last sale date).
+RFM_QUERY = """
+    CREATE TEMP TABLE CustomerRFM AS
+    SELECT
+        f.customer_id,
+        julianday((SELECT MAX(full_date) FROM TimeDim)) + 1 - julianday(MAX(t.full_date)) AS recency,
+        COUNT(DISTINCT f.invoice_no) AS frequency,
+        SUM(f.total_sales) AS monetary
+    FROM SalesFact f
+    JOIN TimeDim t ON f.time_id = t.time_id
+    GROUP BY f.customer_id
+    ORDER BY f.customer_id
+"""
+
+def rfm_chunks(conn, chunksize=CHUNK_SIZE):
+    """Yield (customer_ids, feature matrix) chunks of the RFM table.
+
+    Frequency and monetary value are log-scaled (log1p): both are heavily skewed, and
+    without it a handful of wholesale customers would get their own clusters.
+    """
+    cursor = conn.execute(f"SELECT customer_id, {', '.join(FEATURES)} FROM temp.CustomerRFM ORDER BY rowid")
+    while True:
+        rows = cursor.fetchmany(chunksize)
+        if not rows:
+            break
+        data = np.array(rows, dtype=np.float64)
+        features = data[:, 1:]
+        features[:, 1:] = np.log1p(np.maximum(features[:, 1:], 0))
+        yield data[:, 0].astype(np.int64), features
+
+def ensure_segment_column(conn):
+    """Add CustomerDim.segment to warehouses built before the column was in the schema."""
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(CustomerDim)")]
+    if 'segment' not in columns:
+        conn.execute("ALTER TABLE CustomerDim ADD COLUMN segment INTEGER")
+
+def segment_customers(n_segments=4, epochs=3, chunksize=CHUNK_SIZE, db_file=DB_FILE, random_state=42):
+    """RFM segmentation of the warehouse customers, written to CustomerDim.segment.
+
+    Passes over the RFM table in chunks: fit a MinMaxScaler incrementally, train
+    MiniBatchKMeans with partial_fit for the given number of epochs, then label every
+    customer. Segments are numbered by descending mean monetary value of their center
+    (0 = most valuable). Returns a per-segment summary DataFrame.
+    """
+    print("--- Customer Segmentation (RFM) ---")
+    conn = sqlite3.connect(db_file)
+    try:
+        start = time.perf_counter()
+        conn.execute("DROP TABLE IF EXISTS temp.CustomerRFM")
+        conn.execute(RFM_QUERY)
+        n_customers = conn.execute("SELECT COUNT(*) FROM temp.CustomerRFM").fetchone()[0]
+        print(f"Computed RFM for {n_customers} customers in {time.perf_counter() - start:.2f}s")
+        if n_customers < n_segments:
+            print("Not enough customers to segment.")
+            return None
+
+        # Pass 1: scaler
+        scaler = MinMaxScaler()
+        for _, features in rfm_chunks(conn, chunksize):
+            scaler.partial_fit(features)
+
+        # Pass 2: clustering, a few epochs of mini-batches
+        model = MiniBatchKMeans(n_clusters=n_segments, random_state=random_state, n_init=3,
+                                batch_size=min(chunksize, 4096))
+        rng = np.random.default_rng(random_state)
+        start = time.perf_counter()
+        for epoch in range(epochs):
+            for _, features in rfm_chunks(conn, chunksize):
+                if len(features) < n_segments:
+                    continue
+                scaled = scaler.transform(features)
+                model.partial_fit(scaled[rng.permutation(len(scaled))])
+        print(f"Trained MiniBatchKMeans (k={n_segments}, {epochs} epochs) in {time.perf_counter() - start:.2f}s")
+
+        # Stable numbering: by the monetary coordinate of the centers, largest first
+        order = np.argsort(-model.cluster_centers_[:, FEATURES.index('monetary')])
+        relabel = np.empty(n_segments, dtype=np.int64)
+        relabel[order] = np.arange(n_segments)
+
+        # Pass 3: label customers, in one transaction
+        ensure_segment_column(conn)
+        conn.execute("UPDATE CustomerDim SET segment = NULL")
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS CustomerSegment (customer_id INTEGER PRIMARY KEY, segment INTEGER)")
+        conn.execute("DELETE FROM temp.CustomerSegment")
+        for customer_ids, features in rfm_chunks(conn, chunksize):
+            labels = relabel[model.predict(scaler.transform(features))]
+            conn.executemany("INSERT INTO temp.CustomerSegment VALUES (?, ?)",
+                             zip(customer_ids.tolist(), labels.tolist()))
+        conn.execute("""
+            UPDATE CustomerDim
+            SET segment = (SELECT s.segment FROM temp.CustomerSegment s WHERE s.customer_id = CustomerDim.customer_id)
+            WHERE customer_id IN (SELECT customer_id FROM temp.CustomerSegment)
+        """)
+        conn.commit()
+
+        summary = pd.read_sql_query("""
+            SELECT s.segment, COUNT(*) AS customers,
+                   AVG(r.recency) AS avg_recency_days, AVG(r.frequency) AS avg_invoices,
+                   AVG(r.monetary) AS avg_monetary
+            FROM temp.CustomerSegment s
+            JOIN temp.CustomerRFM r ON r.customer_id = s.customer_id
+            GROUP BY s.segment
+            ORDER BY s.segment
+        """, conn)
+        print("\nSegments written to CustomerDim.segment:")
+        print(summary.round(2).to_string(index=False))
+        return summary
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="RFM customer segmentation of the retail warehouse")
+    parser.add_argument('--segments', type=int, default=4)
+    parser.add_argument('--epochs', type=int, default=3, help="passes of mini-batch training over the customers")
+    parser.add_argument('--chunksize', type=int, default=CHUNK_SIZE)
+    parser.add_argument('--db', default=DB_FILE)
+    args = parser.parse_args()
+    segment_customers(args.segments, args.epochs, args.chunksize, args.db)
@@ -0,0 +1,95 @@
+import pandas as pd
+import numpy as np
+import os
+import time
+from sklearn.cluster import KMeans, MiniBatchKMeans
+from sklearn.metrics import silhouette_score
+
+# Rows used for the silhouette score (it is quadratic in the rows scored)
+SILHOUETTE_SAMPLE = 5_000
+
+# Matrix shared with pool workers: set directly in-process, or attached from shared memory
+_X = None
+_shm = None
+
+def _attach(name, shape, dtype):
+    """Pool initializer: view the parent's shared-memory matrix (no copy)."""
+    global _X, _shm
+    from multiprocessing import shared_memory
+    _shm = shared_memory.SharedMemory(name=name)
+    _X = np.ndarray(shape, dtype=dtype, buffer=_shm.buf)
+
+def _fit_k(args):
+    """Fit one k on the shared matrix; return its scores and centers."""
+    k, method, n_init, sample_size, silhouette_sample, random_state, batch_size = args
+    from threadpoolctl import threadpool_limits
+
+    start = time.perf_counter()
+    # One BLAS/OpenMP thread per worker process: the pool already uses the cores
+    with threadpool_limits(limits=1 if _shm is not None else None):
+        X = _X
+        if sample_size is not None and sample_size < len(X):
+            rows = np.random.default_rng(random_state).choice(len(X), size=sample_size, replace=False)
+            X = X[np.sort(rows)]
+        if method == 'minibatch':
+            model = MiniBatchKMeans(n_clusters=k, random_state=random_state, n_init=n_init,
+                                    batch_size=batch_size)
+        else:
+            model = KMeans(n_clusters=k, random_state=random_state, n_init=n_init)
+        model.fit(X)
+        if X is not _X:
+            # Warm start: refine the sample solution on all rows from its centers (one init)
+            model = KMeans(n_clusters=k, init=model.cluster_centers_, n_init=1, random_state=random_state)
+            model.fit(_X)
+        labels = model.labels_
+        silhouette = np.nan
+        if len(np.unique(labels)) > 1:
+            silhouette = silhouette_score(_X, labels, sample_size=min(silhouette_sample, len(_X)),
+                                          random_state=random_state)
+    return {
+        'k': k,
+        'inertia': model.inertia_,
+        'silhouette': silhouette,
+        'n_iter': model.n_iter_,
+        'fit_seconds': time.perf_counter() - start,
+        'centers': model.cluster_centers_,
+    }
+
+def select_k(X, k_values=range(2, 11), method='kmeans', n_init=10, sample_size=None,
+             silhouette_sample=SILHOUETTE_SAMPLE, workers=1, random_state=42, batch_size=4096):
+    """Fit every k in k_values and score it, for the elbow/silhouette choice of k.
+
+    method='kmeans' fits KMeans(n_init) on all rows, exactly as a plain loop would.
+    method='minibatch' uses MiniBatchKMeans. With sample_size, each k is fitted on a random
+    sample of rows and then refined on all rows from the sample's centers, so the reported
+    inertia is always over the full matrix. Silhouette scores use at most silhouette_sample
+    rows. With workers > 1 the k values are fitted in a process pool that reads X from
+    shared memory instead of receiving a copy per task.
+
+    Returns a DataFrame with k, inertia, silhouette, n_iter, fit_seconds and centers.
+    """
+    global _X
+    X = np.ascontiguousarray(X, dtype=np.float64)
+    jobs = [(k, method, n_init, sample_size, silhouette_sample, random_state, batch_size) for k in k_values]
+    if workers == 1:
+        _X = X
+        try:
+            results = [_fit_k(job) for job in jobs]
+        finally:
+            _X = None
+        return pd.DataFrame(results)
+
+    from concurrent.futures import ProcessPoolExecutor
+    from multiprocessing import shared_memory
+    shm = shared_memory.SharedMemory(create=True, size=max(X.nbytes, 1))
+    try:
+        np.ndarray(X.shape, dtype=X.dtype, buffer=shm.buf)[...] = X
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count(), initializer=_attach,
+                                 initargs=(shm.name, X.shape, X.dtype)) as pool:
+            # Largest k first: they take longest, so the pool finishes evenly
+            order = sorted(range(len(jobs)), key=lambda i: -jobs[i][0])
+            results = dict(zip(order, pool.map(_fit_k, [jobs[i] for i in order])))
+        return pd.DataFrame([results[i] for i in range(len(jobs))])
+    finally:
+        shm.close()
+        shm.unlink()
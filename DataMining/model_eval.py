@@ -0,0 +1,214 @@
+import pandas as pd
+import argparse
+import hashlib
+import json
+import numpy as np
+import os
+import sqlite3
+import time
+import sklearn
+from sklearn.base import clone
+from sklearn.metrics import get_scorer
+from sklearn.model_selection import ParameterGrid, StratifiedKFold
+from sklearn.neighbors import KNeighborsClassifier
+
+# Define paths
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DB_FILE = os.path.join(BASE_DIR, '..', 'DataWarehousing', 'retail_dw.db')
+CACHE_FILE = os.path.join(BASE_DIR, 'model_eval_cache.json')
+
+# From this many training rows on, KNN queries go through a KD-tree/ball-tree instead of brute force
+KNN_TREE_MIN_ROWS = 10_000
+# KD-trees degrade towards brute force in high dimensions; ball trees hold up better there
+KNN_KD_TREE_MAX_FEATURES = 15
+
+# Data shared with pool workers through the initializer (sent once per worker, not per job)
+_X = None
+_y = None
+
+def dataset_hash(X, y):
+    """Content hash of a dataset: shapes, dtypes and values of X and y.
+
+    Object arrays (string labels, mixed columns) hold pointers, so they are hashed by
+    value with pd.util.hash_array instead of by their bytes.
+    """
+    digest = hashlib.sha256()
+    for array in (np.ascontiguousarray(X), np.ascontiguousarray(y)):
+        digest.update(f"{array.shape}{array.dtype}".encode())
+        if array.dtype == object:
+            array = pd.util.hash_array(array.ravel())
+        digest.update(array.tobytes())
+    return digest.hexdigest()
+
+def make_folds(y, n_splits=5, shuffle=False, random_state=None):
+    """Stratified CV folds as (train, test) index arrays, computed once for every model.
+
+    The defaults are the folds cross_val_score(cv=n_splits) uses for a classifier.
+    """
+    splitter = StratifiedKFold(n_splits=n_splits, shuffle=shuffle, random_state=random_state if shuffle else None)
+    return list(splitter.split(np.zeros(len(y)), y))
+
+def knn_model(n_neighbors=5, n_rows=None, n_features=None, **params):
+    """KNeighborsClassifier whose neighbor search suits the data size.
+
+    Small training sets use brute force. From KNN_TREE_MIN_ROWS rows on, the search uses a
+    KD-tree, or a ball tree above KNN_KD_TREE_MAX_FEATURES features.
+    """
+    algorithm = 'brute'
+    if n_rows is not None and n_rows >= KNN_TREE_MIN_ROWS:
+        algorithm = 'kd_tree' if (n_features or 0) <= KNN_KD_TREE_MAX_FEATURES else 'ball_tree'
+    return KNeighborsClassifier(n_neighbors=n_neighbors, algorithm=algorithm, **params)
+
+def expand_grid(name, estimator, grid):
+    """(name, estimator) pairs for every combination in a parameter grid."""
+    models = []
+    for params in ParameterGrid(grid):
+        # Pipeline step prefixes (step__param) are left out of the label
+        label = name + '(' + ', '.join(f"{k.split('__')[-1]}={v}" for k, v in sorted(params.items())) + ')'
+        models.append((label, clone(estimator).set_params(**params)))
+    return models
+
+def config_key(data_hash, estimator, folds, scoring):
+    """Cache key: dataset hash, estimator class and parameters, fold layout, scoring, sklearn version."""
+    params = sorted((k, repr(v)) for k, v in estimator.get_params(deep=True).items())
+    fold_hash = hashlib.sha256(b''.join(test.astype(np.int64).tobytes() for _, test in folds)).hexdigest()
+    payload = json.dumps([data_hash, type(estimator).__module__, type(estimator).__name__,
+                          params, fold_hash, scoring, sklearn.__version__])
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+def load_cache(cache_file):
+    if cache_file and os.path.exists(cache_file):
+        with open(cache_file) as f:
+            return json.load(f)
+    return {}
+
+def save_cache(cache, cache_file):
+    """Write the cache atomically (a rename), so an interrupted run never leaves it half-written."""
+    tmp_file = cache_file + '.tmp'
+    with open(tmp_file, 'w') as f:
+        json.dump(cache, f)
+    os.replace(tmp_file, cache_file)
+
+def _init_worker(X, y):
+    global _X, _y
+    _X, _y = X, y
+
+def _fit_fold(args):
+    """Fit one model on one fold's training rows; return its test score and fit time."""
+    job, estimator, train, test, scoring = args
+    start = time.perf_counter()
+    model = clone(estimator).fit(_X[train], _y[train])
+    score = get_scorer(scoring)(model, _X[test], _y[test])
+    return job, float(score), time.perf_counter() - start
+
+def evaluate_models(models, X, y, folds=5, scoring='accuracy', workers=1, cache_file=CACHE_FILE):
+    """Cross-validate every (name, estimator) in models on the same folds.
+
+    folds is a number of stratified folds or a list from make_folds(). Each fold x model
+    pair is one job; with workers > 1 the jobs run in a process pool that receives X and y
+    once per worker. Fold scores are cached by dataset hash, model and parameters (see
+    config_key), so configurations already evaluated on the same data are not retrained.
+    Pass cache_file=None to disable the cache.
+
+    Returns a DataFrame with model, mean, std, scores, fit_seconds and cached per model.
+    """
+    X = np.asarray(X)
+    y = np.asarray(y)
+    if isinstance(folds, int):
+        folds = make_folds(y, folds)
+    data_hash = dataset_hash(X, y)
+    cache = load_cache(cache_file)
+
+    keys = [config_key(data_hash, estimator, folds, scoring) for _, estimator in models]
+    pending = [i for i, key in enumerate(keys) if key not in cache]
+    jobs = [((i, f), models[i][1], train, test, scoring)
+            for i in pending for f, (train, test) in enumerate(folds)]
+
+    if not jobs:
+        # Everything cached: no pool, no copies of X and y
+        results = []
+    elif workers == 1:
+        _init_worker(X, y)
+        try:
+            results = list(map(_fit_fold, jobs))
+        finally:
+            _init_worker(None, None)
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        workers = workers or os.cpu_count()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(X, y)) as pool:
+            results = list(pool.map(_fit_fold, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+
+    scores = {i: [None] * len(folds) for i in pending}
+    seconds = {i: 0.0 for i in pending}
+    for (i, f), score, elapsed in results:
+        scores[i][f] = score
+        seconds[i] += elapsed
+    for i in pending:
+        cache[keys[i]] = {'model': models[i][0], 'scores': scores[i], 'fit_seconds': seconds[i]}
+    if pending and cache_file:
+        save_cache(cache, cache_file)
+
+    rows = []
+    for i, (name, _) in enumerate(models):
+        entry = cache[keys[i]]
+        fold_scores = np.array(entry['scores'])
+        rows.append({'model': name, 'mean': fold_scores.mean(), 'std': fold_scores.std(),
+                     'scores': entry['scores'], 'fit_seconds': entry['fit_seconds'],
+                     'cached': i not in scores})
+    return pd.DataFrame(rows)
+
+def warehouse_customer_features(db_file=DB_FILE):
+    """Customer-level features from the warehouse, labelled with CustomerDim.segment.
+
+    Features are recency, frequency and monetary value (as in customer_segments.py) plus
+    distinct products and mean invoice value. Run customer_segments.py first.
+    """
+    from customer_segments import RFM_QUERY
+    conn = sqlite3.connect(db_file)
+    try:
+        conn.execute("DROP TABLE IF EXISTS temp.CustomerRFM")
+        conn.execute(RFM_QUERY)
+        df = pd.read_sql_query("""
+            SELECT r.recency, r.frequency, r.monetary,
+                   p.products, r.monetary / r.frequency AS invoice_value, c.segment
+            FROM temp.CustomerRFM r
+            JOIN CustomerDim c ON c.customer_id = r.customer_id
+            JOIN (SELECT customer_id, COUNT(DISTINCT product_id) AS products
+                  FROM SalesFact GROUP BY customer_id) p ON p.customer_id = r.customer_id
+            WHERE c.segment IS NOT NULL
+        """, conn)
+    finally:
+        conn.close()
+    return df.drop(columns='segment').to_numpy(dtype=np.float64), df['segment'].to_numpy()
+
+def default_models(n_rows, n_features):
+    """The model grid compared on warehouse features: decision trees and (scaled) KNN."""
+    from sklearn.pipeline import make_pipeline
+    from sklearn.preprocessing import MinMaxScaler
+    from sklearn.tree import DecisionTreeClassifier
+    knn = make_pipeline(MinMaxScaler(), knn_model(n_rows=n_rows, n_features=n_features))
+    return (expand_grid('DecisionTree', DecisionTreeClassifier(random_state=42),
+                        {'max_depth': [3, 5, 10, None], 'min_samples_leaf': [1, 5, 20]})
+            + expand_grid('KNN', knn, {'kneighborsclassifier__n_neighbors': [5, 15, 45],
+                                       'kneighborsclassifier__weights': ['uniform', 'distance']}))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cross-validate classifiers on customer-level warehouse features")
+    parser.add_argument('--folds', type=int, default=5)
+    parser.add_argument('--workers', type=int, default=1, help="fold x model processes (0 = one per CPU)")
+    parser.add_argument('--no-cache', action='store_true', help="retrain every configuration")
+    parser.add_argument('--db', default=DB_FILE)
+    args = parser.parse_args()
+
+    X, y = warehouse_customer_features(args.db)
+    if len(y) == 0:
+        print("No segmented customers found. Run customer_segments.py first.")
+    else:
+        print(f"{len(y)} customers, {X.shape[1]} features, {len(np.unique(y))} segments")
+        start = time.perf_counter()
+        results = evaluate_models(default_models(*X.shape), X, y, args.folds, workers=args.workers,
+                                  cache_file=None if args.no_cache else CACHE_FILE)
+        print(results.sort_values('mean', ascending=False)[['model', 'mean', 'std', 'fit_seconds', 'cached']]
+              .round(4).to_string(index=False))
+        print(f"Evaluated {len(results)} models in {time.perf_counter() - start:.2f}s")
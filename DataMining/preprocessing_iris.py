@@ -1,15 +1,18 @@
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
 from sklearn.datasets import load_iris
 from sklearn.preprocessing import MinMaxScaler
 from sklearn.model_selection import train_test_split
 import os
 
+from charts import Chart, render, report
+
 # Define paths
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
+# Larger DataFrames get the streaming EDA (pairplot of every row and pd.melt stop scaling)
+EDA_FULL_MAX_ROWS = 100_000
+
 def preprocess_iris():
     print("--- 1.1 Load and Preprocess Iris Dataset ---")
     
@@ -39,36 +42,52 @@ def preprocess_iris():
     
     return df, df_normalized, feature_cols
 
-def perform_eda(df, feature_cols):
-    print("\n--- 1.3 Exploratory Data Analysis (EDA) ---")
-    
-    # 1. Summary Statistics
-    print("\nSummary Statistics:")
-    print(df.describe())
-    
-    # 2. Pairplot
-    print("Generating Pairplot...")
-    sns.pairplot(df, hue='species', diag_kind='hist')
-    plt.savefig(os.path.join(BASE_DIR, 'pairplot.png'))
-    plt.close()
-    
-    # 3. Correlation Heatmap
-    print("Generating Correlation Heatmap...")
+def draw_pairplot(df, hue):
+    import seaborn as sns
+    sns.pairplot(df, hue=hue, diag_kind='hist')
+
+def draw_correlation_heatmap(corr):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
     plt.figure(figsize=(10, 8))
-    corr = df[feature_cols].corr()
     sns.heatmap(corr, annot=True, cmap='coolwarm', fmt=".2f")
     plt.title('Correlation Matrix of Iris Features')
-    plt.savefig(os.path.join(BASE_DIR, 'correlation_heatmap.png'))
-    plt.close()
-    
-    # 4. Outlier Detection (Boxplots)
-    print("Generating Boxplots for Outlier Detection...")
+
+def draw_boxplots(df_melted):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
     plt.figure(figsize=(12, 6))
-    df_melted = pd.melt(df, id_vars=['species'], value_vars=feature_cols)
     sns.boxplot(x='variable', y='value', data=df_melted)
     plt.title('Boxplot of Iris Features')
-    plt.savefig(os.path.join(BASE_DIR, 'boxplots.png'))
-    plt.close()
+
+def perform_eda(df, feature_cols, hue='species', large=None, **stream_options):
+    """EDA plots and statistics. df is a DataFrame, a SQLite query string or an iterable of
+    DataFrame chunks. Anything but a DataFrame of at most EDA_FULL_MAX_ROWS rows (or with
+    large=True) goes through the single-pass mode in streaming_eda.py."""
+    print("\n--- 1.3 Exploratory Data Analysis (EDA) ---")
+    if large is None:
+        large = not isinstance(df, pd.DataFrame) or len(df) > EDA_FULL_MAX_ROWS
+    if large:
+        from streaming_eda import streaming_eda
+        return streaming_eda(df, feature_cols, hue, **stream_options)
+    
+    # 1. Summary Statistics
+    print("\nSummary Statistics:")
+    print(df.describe())
+    
+    # 2. Pairplot, 3. Correlation Heatmap, 4. Outlier Detection (Boxplots)
+    # Drawn concurrently, and only when their input data changed (see charts.py)
+    print("Generating Pairplot, Correlation Heatmap and Boxplots...")
+    paths = {os.path.join(BASE_DIR, 'pairplot.png'): "Pairplot",
+             os.path.join(BASE_DIR, 'correlation_heatmap.png'): "Correlation heatmap",
+             os.path.join(BASE_DIR, 'boxplots.png'): "Boxplots"}
+    pairplot_path, heatmap_path, boxplots_path = paths
+    status = render([
+        Chart(pairplot_path, draw_pairplot, df=df, hue=hue),
+        Chart(heatmap_path, draw_correlation_heatmap, corr=df[feature_cols].corr()),
+        Chart(boxplots_path, draw_boxplots, df_melted=pd.melt(df, id_vars=[hue], value_vars=feature_cols)),
+    ])
+    report(status, paths)
     
     print("EDA Visualizations saved.")
 
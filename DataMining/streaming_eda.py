@@ -0,0 +1,272 @@
+import pandas as pd
+import argparse
+import numpy as np
+import os
+import sqlite3
+import time
+
+from charts import Chart, render, report
+
+# Define paths
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DB_FILE = os.path.join(BASE_DIR, '..', 'DataWarehousing', 'retail_dw.db')
+
+# Rows per chunk when a DataFrame or a SQLite query is streamed
+CHUNK_SIZE = 100_000
+# Centroids kept per column by the quantile sketch (rank error is about 1 / capacity)
+SKETCH_CAPACITY = 2_000
+# Rows kept per hue value for the pairplot
+SAMPLE_PER_CLASS = 1_000
+
+class QuantileSketch:
+    """Mergeable approximate quantiles of a column: a bounded list of weighted centroids.
+
+    Each update merges the chunk into the centroids and, above capacity, collapses runs
+    of neighboring values into their weighted mean (as a t-digest does, with uniform
+    rank buckets). Min and max are exact.
+    """
+
+    def __init__(self, capacity=SKETCH_CAPACITY):
+        self.capacity = capacity
+        self.values = np.empty(0)
+        self.weights = np.empty(0)
+        self.min = np.inf
+        self.max = -np.inf
+
+    @staticmethod
+    def _compress(values, weights, capacity):
+        """Collapse sorted (values, weights) into at most capacity equal-weight buckets."""
+        rank = np.cumsum(weights) - weights
+        bucket = np.minimum((rank / weights.sum() * capacity).astype(np.int64), capacity - 1)
+        starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+        totals = np.add.reduceat(weights, starts)
+        return np.add.reduceat(values * weights, starts) / totals, totals
+
+    def update(self, x):
+        x = np.asarray(x, dtype=np.float64)
+        x = np.sort(x[~np.isnan(x)])
+        if len(x) == 0:
+            return
+        self.min = min(self.min, x[0])
+        self.max = max(self.max, x[-1])
+        values = np.concatenate([self.values, x])
+        weights = np.concatenate([self.weights, np.ones(len(x))])
+        order = np.argsort(values, kind='stable')
+        values, weights = values[order], weights[order]
+        if len(values) > self.capacity:
+            values, weights = self._compress(values, weights, self.capacity)
+        self.values, self.weights = values, weights
+
+    def quantile(self, q):
+        if len(self.values) == 0:
+            return np.full(np.shape(q), np.nan)
+        # Centroid i sits at the middle of its rank range; ends are pinned to the exact min/max
+        total = self.weights.sum()
+        ranks = np.r_[0.0, np.cumsum(self.weights) - self.weights / 2, total]
+        values = np.r_[self.min, self.values, self.max]
+        return np.interp(np.asarray(q) * total, ranks, values)
+
+class StreamingStats:
+    """One pass over chunks: moments, co-moments, quantile sketches and a stratified sample.
+
+    Moments are merged per chunk with Chan's parallel update: per column for count, mean
+    and std (as describe() does), and over the rows that have every feature for the
+    co-moment matrix behind the Pearson correlations. Min, max and quantiles are per column.
+    The sample keeps the rows with the smallest random keys per hue value, i.e. a uniform
+    sample of up to sample_per_class rows of each class.
+    """
+
+    def __init__(self, feature_cols, hue=None, sample_per_class=SAMPLE_PER_CLASS, random_state=42):
+        self.feature_cols = list(feature_cols)
+        self.hue = hue
+        self.sample_per_class = sample_per_class
+        self.rng = np.random.default_rng(random_state)
+        k = len(self.feature_cols)
+        self.counts = np.zeros(k, dtype=np.int64)
+        self.means = np.zeros(k)
+        self.m2 = np.zeros(k)
+        self.n = 0
+        self.mean = np.zeros(k)
+        self.comoment = np.zeros((k, k))
+        self.sketches = [QuantileSketch() for _ in self.feature_cols]
+        self.sample = None
+        self.rows = 0
+
+    def update(self, chunk):
+        self.rows += len(chunk)
+        X = chunk[self.feature_cols].to_numpy(dtype=np.float64)
+        for j, sketch in enumerate(self.sketches):
+            sketch.update(X[:, j])
+
+        valid = ~np.isnan(X)
+        n_b = valid.sum(axis=0)
+        if n_b.any():
+            with np.errstate(invalid='ignore', divide='ignore'):
+                mean_b = np.where(n_b > 0, np.nansum(X, axis=0) / n_b, 0.0)
+            m2_b = np.nansum((X - mean_b) ** 2, axis=0)
+            n = self.counts + n_b
+            delta = mean_b - self.means
+            with np.errstate(invalid='ignore', divide='ignore'):
+                self.m2 += m2_b + np.where(n > 0, delta ** 2 * self.counts * n_b / n, 0.0)
+                self.means += np.where(n > 0, delta * n_b / n, 0.0)
+            self.counts = n
+
+        complete = X[~np.isnan(X).any(axis=1)]
+        n_b = len(complete)
+        if n_b:
+            mean_b = complete.mean(axis=0)
+            centered = complete - mean_b
+            n = self.n + n_b
+            delta = mean_b - self.mean
+            self.comoment += centered.T @ centered + np.outer(delta, delta) * (self.n * n_b / n)
+            self.mean += delta * (n_b / n)
+            self.n = n
+
+        columns = self.feature_cols + ([self.hue] if self.hue else [])
+        part = chunk[columns].assign(_key=self.rng.random(len(chunk)))
+        combined = part if self.sample is None else pd.concat([self.sample, part], ignore_index=True)
+        combined = combined.sort_values('_key', kind='stable')
+        if self.hue:
+            self.sample = combined.groupby(self.hue, sort=False, observed=True).head(self.sample_per_class)
+        else:
+            self.sample = combined.head(self.sample_per_class)
+
+    def describe(self):
+        """DataFrame.describe() layout; the quartiles are approximate."""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            std = np.sqrt(self.m2 / (self.counts - 1))
+        quartiles = np.array([sketch.quantile([0.25, 0.5, 0.75]) for sketch in self.sketches])
+        return pd.DataFrame({
+            'count': self.counts.astype(np.float64),
+            'mean': np.where(self.counts > 0, self.means, np.nan),
+            'std': std,
+            'min': [sketch.min for sketch in self.sketches],
+            '25%': quartiles[:, 0],
+            '50%': quartiles[:, 1],
+            '75%': quartiles[:, 2],
+            'max': [sketch.max for sketch in self.sketches],
+        }, index=self.feature_cols).T
+
+    def corr(self):
+        scale = np.sqrt(np.diag(self.comoment))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            corr = self.comoment / np.outer(scale, scale)
+        return pd.DataFrame(corr, index=self.feature_cols, columns=self.feature_cols)
+
+    def box_stats(self):
+        """Per-feature boxplot statistics for Axes.bxp (1.5 IQR whiskers).
+
+        Whisker ends are the most extreme sketch values inside the fences; fliers are the
+        sampled values outside the whiskers, so only a bounded number of points is drawn.
+        """
+        stats = []
+        for col, sketch in zip(self.feature_cols, self.sketches):
+            q1, med, q3 = sketch.quantile([0.25, 0.5, 0.75])
+            low, high = q1 - 1.5 * (q3 - q1), q3 + 1.5 * (q3 - q1)
+            points = np.r_[sketch.min, sketch.values, sketch.max]
+            inside = points[(points >= low) & (points <= high)]
+            whislo = inside.min() if len(inside) else q1
+            whishi = inside.max() if len(inside) else q3
+            sampled = self.sample[col].to_numpy(dtype=np.float64) if self.sample is not None else np.empty(0)
+            stats.append({'label': col, 'q1': q1, 'med': med, 'q3': q3, 'whislo': whislo, 'whishi': whishi,
+                          'fliers': sampled[(sampled < whislo) | (sampled > whishi)]})
+        return stats
+
+def iter_chunks(source, chunksize=CHUNK_SIZE, db_file=DB_FILE):
+    """Chunks of a DataFrame, a SQLite query string (run on db_file) or an iterable of DataFrames."""
+    if isinstance(source, pd.DataFrame):
+        for start in range(0, len(source), chunksize):
+            yield source.iloc[start:start + chunksize]
+    elif isinstance(source, str):
+        conn = sqlite3.connect(db_file)
+        try:
+            yield from pd.read_sql_query(source, conn, chunksize=chunksize)
+        finally:
+            conn.close()
+    else:
+        yield from source
+
+def stream_stats(source, feature_cols=None, hue=None, chunksize=CHUNK_SIZE, db_file=DB_FILE,
+                 sample_per_class=SAMPLE_PER_CLASS):
+    """Collect StreamingStats over source in one pass. Without feature_cols, every numeric
+    column except hue is used."""
+    stats = None
+    for chunk in iter_chunks(source, chunksize, db_file):
+        if stats is None:
+            if feature_cols is None:
+                feature_cols = [c for c in chunk.select_dtypes('number').columns if c != hue]
+            stats = StreamingStats(feature_cols, hue, sample_per_class)
+        stats.update(chunk)
+    return stats
+
+def draw_sample_pairplot(sample, feature_cols, hue, pair_kind):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    if pair_kind == 'hexbin':
+        grid = sns.PairGrid(sample, vars=feature_cols)
+        grid.map_diag(plt.hist, bins=30)
+        grid.map_offdiag(plt.hexbin, gridsize=30, cmap='Blues', mincnt=1)
+    else:
+        sns.pairplot(sample, vars=feature_cols, hue=hue, diag_kind='hist', plot_kws={'s': 10, 'alpha': 0.5})
+
+def draw_correlation_heatmap(corr):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    plt.figure(figsize=(10, 8))
+    sns.heatmap(corr, annot=True, cmap='coolwarm', fmt=".2f")
+    plt.title('Correlation Matrix')
+
+def draw_box_stats(box_stats):
+    import matplotlib.pyplot as plt
+    fig, ax = plt.subplots(figsize=(12, 6))
+    ax.bxp(box_stats, flierprops={'markersize': 3})
+    ax.set_title('Boxplot of Features (outliers from sample)')
+
+def streaming_eda(source, feature_cols=None, hue=None, chunksize=CHUNK_SIZE, db_file=DB_FILE,
+                  sample_per_class=SAMPLE_PER_CLASS, pair_kind='scatter', output_dir=BASE_DIR, prefix='large_'):
+    """EDA of data too large to plot row by row: the same outputs as perform_eda.
+
+    Summary statistics, correlations and boxplot quantiles come from one streaming pass
+    (see StreamingStats). The pairplot is drawn from the stratified sample, as a scatter
+    plot or (pair_kind='hexbin') as hexbin densities. The PNGs are named prefix +
+    'pairplot.png' etc., so the default prefix keeps the Iris report images. Returns the
+    StreamingStats.
+    """
+    start = time.perf_counter()
+    stats = stream_stats(source, feature_cols, hue, chunksize, db_file, sample_per_class)
+    if stats is None:
+        print("No rows to analyse.")
+        return None
+    print(f"Streamed {stats.rows} rows in {time.perf_counter() - start:.2f}s "
+          f"(pairplot sample: {len(stats.sample)} rows)")
+
+    print("\nSummary Statistics (quartiles approximate):")
+    print(stats.describe())
+
+    # Charts are drawn concurrently, and only when their inputs changed (see charts.py)
+    print("Generating Pairplot, Correlation Heatmap and Boxplots...")
+    paths = {os.path.join(output_dir, prefix + 'pairplot.png'): "Pairplot",
+             os.path.join(output_dir, prefix + 'correlation_heatmap.png'): "Correlation heatmap",
+             os.path.join(output_dir, prefix + 'boxplots.png'): "Boxplots"}
+    pairplot_path, heatmap_path, boxplots_path = paths
+    status = render([
+        Chart(pairplot_path, draw_sample_pairplot, sample=stats.sample.drop(columns='_key'),
+              feature_cols=stats.feature_cols, hue=hue, pair_kind=pair_kind),
+        Chart(heatmap_path, draw_correlation_heatmap, corr=stats.corr()),
+        Chart(boxplots_path, draw_box_stats, box_stats=stats.box_stats()),
+    ])
+    report(status, paths)
+
+    print("EDA Visualizations saved.")
+    return stats
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Streaming EDA of a warehouse query")
+    parser.add_argument('--query', default="SELECT quantity, unit_price, total_sales FROM SalesFact")
+    parser.add_argument('--hue', help="column to stratify the pairplot sample by")
+    parser.add_argument('--pair-kind', choices=['scatter', 'hexbin'], default='hexbin')
+    parser.add_argument('--chunksize', type=int, default=CHUNK_SIZE)
+    parser.add_argument('--db', default=DB_FILE)
+    args = parser.parse_args()
+    streaming_eda(args.query, hue=args.hue, chunksize=args.chunksize, db_file=args.db,
+                  pair_kind=args.pair_kind, prefix='warehouse_')
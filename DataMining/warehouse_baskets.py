@@ -0,0 +1,200 @@
+import pandas as pd
+import argparse
+import math
+import numpy as np
+import os
+import sqlite3
+import time
+
+# Define paths
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DB_FILE = os.path.join(BASE_DIR, '..', 'DataWarehousing', 'retail_dw.db')
+RULES_FILE = os.path.join(BASE_DIR, 'association_rules_warehouse.csv')
+
+# (invoice, product) rows fetched per read in the encoding pass
+FETCH_SIZE = 200_000
+
+# Bitmaps of the top-level classes, shared with pool workers through the initializer
+_bits = None
+
+if hasattr(np, 'bitwise_count'):
+    def popcount(words):
+        """Set bits per row of a uint64 bitmap matrix."""
+        return np.bitwise_count(words).sum(axis=-1, dtype=np.int64)
+else: # NumPy < 2.0
+    _BYTE_COUNTS = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+    def popcount(words):
+        """Set bits per row of a uint64 bitmap matrix."""
+        return _BYTE_COUNTS[words.view(np.uint8)].sum(axis=-1, dtype=np.int64)
+
+def frequent_products(conn, min_support):
+    """Pass 1: transaction count and the products in at least min_support of the invoices.
+
+    Counting happens in SQLite, so items below the threshold are pruned before any
+    transaction is encoded. Returns (n_transactions, DataFrame of product_id, stock_code,
+    count), ordered by ascending count.
+    """
+    n_transactions = conn.execute("SELECT COUNT(DISTINCT invoice_no) FROM SalesFact").fetchone()[0]
+    min_count = max(1, math.ceil(min_support * n_transactions))
+    items = pd.read_sql_query("""
+        SELECT f.product_id, p.stock_code, COUNT(DISTINCT f.invoice_no) AS count
+        FROM SalesFact f
+        JOIN ProductDim p ON p.product_id = f.product_id
+        GROUP BY f.product_id
+        HAVING COUNT(DISTINCT f.invoice_no) >= ?
+        ORDER BY count, f.product_id
+    """, conn, params=(min_count,))
+    return n_transactions, items
+
+def encode_baskets(conn, product_ids, fetch_size=FETCH_SIZE):
+    """Pass 2: stream invoice -> product rows of the given products into a vertical bitmap.
+
+    Row i of the result is the set of invoices (one bit each, in uint64 words) that contain
+    product_ids[i]. Invoices are numbered as they arrive in invoice_no order, so only the
+    bitmaps, never the baskets, are held in memory.
+    """
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS BasketItems (product_id INTEGER PRIMARY KEY, item INTEGER)")
+    conn.execute("DELETE FROM temp.BasketItems")
+    conn.executemany("INSERT INTO temp.BasketItems VALUES (?, ?)",
+                     [(int(p), i) for i, p in enumerate(product_ids)])
+    n_invoices = conn.execute("""
+        SELECT COUNT(DISTINCT invoice_no) FROM SalesFact
+        WHERE product_id IN (SELECT product_id FROM temp.BasketItems)
+    """).fetchone()[0]
+    bits = np.zeros((len(product_ids), (n_invoices + 63) // 64), dtype=np.uint64)
+
+    cursor = conn.execute("""
+        SELECT f.invoice_no, b.item
+        FROM SalesFact f
+        JOIN temp.BasketItems b ON b.product_id = f.product_id
+        ORDER BY f.invoice_no
+    """)
+    last_invoice, next_tx = None, 0
+    while True:
+        rows = cursor.fetchmany(fetch_size)
+        if not rows:
+            break
+        invoices = np.array([r[0] for r in rows], dtype=object)
+        items = np.fromiter((r[1] for r in rows), dtype=np.int64, count=len(rows))
+        # A new transaction starts wherever invoice_no changes (also across fetches)
+        starts = np.empty(len(rows), dtype=bool)
+        starts[0] = invoices[0] != last_invoice
+        starts[1:] = invoices[1:] != invoices[:-1]
+        tx = next_tx + np.cumsum(starts) - 1
+        next_tx = int(tx[-1]) + 1
+        last_invoice = invoices[-1]
+        np.bitwise_or.at(bits, (items, tx >> 6), np.left_shift(np.uint64(1), (tx & 63).astype(np.uint64)))
+    return bits
+
+def _mine_class(prefix, items, bits, counts, min_count, max_len, found):
+    """Depth-first Eclat over one equivalence class: items share prefix; bits are their tidsets."""
+    for i in range(len(items)):
+        itemset = prefix + (int(items[i]),)
+        found.append((itemset, int(counts[i])))
+        if (max_len is None or len(itemset) < max_len) and i + 1 < len(items):
+            # Tidsets of itemset + each later item, all in one vectorized AND
+            joined = bits[i + 1:] & bits[i]
+            joined_counts = popcount(joined)
+            keep = joined_counts >= min_count
+            if keep.any():
+                _mine_class(itemset, items[i + 1:][keep], joined[keep], joined_counts[keep],
+                            min_count, max_len, found)
+
+def _init_worker(bits):
+    global _bits
+    _bits = bits
+
+def _mine_top_level(args):
+    """Frequent itemsets whose first item is item i (in ascending-support order)."""
+    i, counts, min_count, max_len = args
+    found = [((i,), int(counts[i]))]
+    if (max_len is None or max_len > 1) and i + 1 < len(_bits):
+        joined = _bits[i + 1:] & _bits[i]
+        joined_counts = popcount(joined)
+        keep = joined_counts >= min_count
+        if keep.any():
+            _mine_class((i,), np.arange(i + 1, len(_bits))[keep], joined[keep], joined_counts[keep],
+                        min_count, max_len, found)
+    return found
+
+def eclat(bits, counts, min_count, max_len=None, workers=1):
+    """Frequent itemsets (tuples of bitmap rows) with their counts, by vertical bitset Eclat.
+
+    The classes of each first item are independent, so with workers > 1 they are counted
+    in a process pool; each worker gets the bitmap once.
+    """
+    jobs = [(i, counts, min_count, max_len) for i in range(len(bits))]
+    if workers == 1:
+        _init_worker(bits)
+        results = map(_mine_top_level, jobs)
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(bits,))
+        results = pool.map(_mine_top_level, jobs, chunksize=max(1, len(jobs) // (workers * 8)))
+    try:
+        return [entry for found in results for entry in found]
+    finally:
+        if workers != 1:
+            pool.shutdown()
+
+def mine_warehouse_baskets(min_support=0.01, max_len=None, workers=1, db_file=DB_FILE):
+    """Frequent itemsets of StockCodes over SalesFact invoices, in mlxtend's apriori format
+    (support, itemsets as frozensets). Returns (itemsets DataFrame, number of invoices)."""
+    conn = sqlite3.connect(db_file)
+    try:
+        start = time.perf_counter()
+        n_transactions, items = frequent_products(conn, min_support)
+        min_count = max(1, math.ceil(min_support * n_transactions))
+        print(f"{n_transactions} invoices, {len(items)} products with support >= {min_support} "
+              f"({time.perf_counter() - start:.2f}s)")
+        start = time.perf_counter()
+        bits = encode_baskets(conn, items['product_id'].to_numpy())
+        print(f"Encoded {bits.shape[0]} x {bits.shape[1] * 64} bitmap ({bits.nbytes / 2**20:.1f} MB) "
+              f"in {time.perf_counter() - start:.2f}s")
+    finally:
+        conn.close()
+
+    start = time.perf_counter()
+    found = eclat(bits, items['count'].to_numpy(), min_count, max_len, workers)
+    print(f"Found {len(found)} frequent itemsets in {time.perf_counter() - start:.2f}s")
+    labels = items['stock_code'].to_numpy()
+    frequent_itemsets = pd.DataFrame({
+        'support': [count / n_transactions for _, count in found],
+        'itemsets': [frozenset(labels[list(itemset)]) for itemset, _ in found],
+    })
+    return frequent_itemsets, n_transactions
+
+def warehouse_association_rules(min_support=0.01, min_confidence=0.5, max_len=None, workers=1,
+                                db_file=DB_FILE, output=RULES_FILE):
+    """3.2 on the warehouse: rules between StockCodes bought in the same invoice, saved in the
+    association_rules.csv format."""
+    print("\n--- 3.2 Association Rule Mining (Warehouse Baskets) ---")
+    try:
+        from mlxtend.frequent_patterns import association_rules
+    except ImportError:
+        print("Error: mlxtend library not found. Please pip install mlxtend.")
+        return 0
+    frequent_itemsets, n_transactions = mine_warehouse_baskets(min_support, max_len, workers, db_file)
+    if frequent_itemsets.empty or frequent_itemsets['itemsets'].map(len).max() < 2:
+        print("No frequent item pairs found with current support threshold.")
+        return 0
+    rules = association_rules(frequent_itemsets, num_itemsets=n_transactions,
+                              metric="confidence", min_threshold=min_confidence)
+    rules = rules.sort_values('lift', ascending=False)
+    print("\nTop 5 Association Rules:")
+    print(rules[['antecedents', 'consequents', 'support', 'confidence', 'lift']].head(5))
+    rules.to_csv(output, index=False)
+    print(f"Rules saved to {os.path.basename(output)}")
+    return len(rules)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Market-basket rules from the retail warehouse")
+    parser.add_argument('--min-support', type=float, default=0.01)
+    parser.add_argument('--min-confidence', type=float, default=0.5)
+    parser.add_argument('--max-len', type=int, help="longest itemset to mine")
+    parser.add_argument('--workers', type=int, default=1, help="counting processes (0 = one per CPU)")
+    parser.add_argument('--db', default=DB_FILE)
+    args = parser.parse_args()
+    warehouse_association_rules(args.min_support, args.min_confidence, args.max_len,
+                                args.workers or os.cpu_count(), args.db)
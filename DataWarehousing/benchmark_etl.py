@@ -0,0 +1,116 @@
+import argparse
+import json
+import os
+import sqlite3
+
+import etl_retail
+from etl_metrics import metrics
+from synthetic_retail import BENCH_DIR, ensure_dataset
+
+# Benchmark warehouse and outputs, kept apart from retail_dw.db
+BENCH_DB = os.path.join(BENCH_DIR, 'bench_dw.db')
+RESULTS_FILE = os.path.join(BENCH_DIR, 'benchmark_results.json')
+PLOT_FILE = os.path.join(BENCH_DIR, 'benchmark_scaling.png')
+
+DEFAULT_SIZES = [10**5, 10**6, 10**7]
+
+def run_size(n_rows, mode='single', bulk=True, workers=1, seed=42):
+    """Run the ETL and the OLAP queries on an n_rows synthetic dataset; return timings per stage."""
+    path = ensure_dataset(n_rows, seed)
+    etl_retail.DB_FILE = BENCH_DB
+    metrics.enable(trace_memory=False)
+
+    with metrics.stage('init_db'):
+        etl_retail.init_db()
+    if mode == 'stream':
+        with metrics.stage('stream_etl', rows_in=n_rows):
+            etl_retail.stream_etl(path)
+    else:
+        with metrics.stage('extract_data', rows_in=n_rows) as m:
+            df_raw = etl_retail.extract_data(path)
+            m['rows_out'] = len(df_raw)
+        with metrics.stage('transform_data', rows_in=len(df_raw)) as m:
+            if workers == 1:
+                data = etl_retail.transform_data(df_raw)
+            else:
+                data = etl_retail.transform_data_parallel(df_raw, workers or None)
+            m['rows_out'] = len(data['SalesFact'])
+        del df_raw
+        with metrics.stage('load_data', rows_in=len(data['SalesFact'])):
+            if bulk:
+                etl_retail.bulk_load_data(data)
+            else:
+                etl_retail.load_data(data)
+        del data
+    with metrics.stage('create_indexes'):
+        etl_retail.create_indexes(report_timings=False)
+
+    conn = sqlite3.connect(BENCH_DB)
+    fact_rows = conn.execute("SELECT COUNT(*) FROM SalesFact").fetchone()[0]
+    conn.close()
+
+    stages = {s['name']: s for s in metrics.report()['stages'] if s['depth'] == 0}
+    etl_seconds = sum(s['wall_s'] for s in stages.values())
+    result = {
+        'rows': n_rows,
+        'fact_rows': fact_rows,
+        'mode': mode,
+        'bulk': bulk,
+        'workers': workers,
+        'etl_seconds': round(etl_seconds, 3),
+        'rows_per_sec': round(n_rows / etl_seconds, 1),
+        'max_rss_mb': max(s['max_rss_mb'] or 0 for s in stages.values()),
+        'stages': {name: s['wall_s'] for name, s in stages.items()},
+        'queries': {name: round(t, 6) for name, t in etl_retail.time_olap_queries().items()},
+    }
+    metrics.enabled = False
+    return result
+
+def plot_scaling(results, path=PLOT_FILE):
+    """Log-log plot of seconds per stage and per OLAP query against input rows."""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    sizes = [r['rows'] for r in results]
+    fig, axes = plt.subplots(1, 2, figsize=(14, 6))
+    for stage in results[0]['stages']:
+        axes[0].plot(sizes, [r['stages'][stage] for r in results], marker='o', label=stage)
+    for query in results[0]['queries']:
+        axes[1].plot(sizes, [r['queries'][query] for r in results], marker='o', label=query)
+    for ax, title in zip(axes, ['ETL stages', 'OLAP queries']):
+        ax.set_xscale('log')
+        ax.set_yscale('log')
+        ax.set_xlabel('Input rows')
+        ax.set_ylabel('Seconds')
+        ax.set_title(title)
+        ax.grid(True)
+        ax.legend(fontsize=8)
+    plt.tight_layout()
+    plt.savefig(path)
+    plt.close()
+    print(f"Scaling plot saved to: {path}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="ETL/OLAP benchmark on synthetic Online Retail data")
+    parser.add_argument('--sizes', type=float, nargs='+', default=DEFAULT_SIZES,
+                        help="input sizes in rows, e.g. 1e5 1e6 1e7 1e8")
+    parser.add_argument('--mode', choices=['single', 'stream'], default='single',
+                        help="single-shot extract/transform/load or the chunked stream_etl")
+    parser.add_argument('--no-bulk', action='store_true', help="load with to_sql instead of the bulk loader")
+    parser.add_argument('--workers', type=int, default=1, help="transform worker processes (0 = one per CPU)")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    results = []
+    for size in args.sizes:
+        results.append(run_size(int(size), args.mode, bulk=not args.no_bulk, workers=args.workers, seed=args.seed))
+
+    with open(RESULTS_FILE, 'w') as f:
+        json.dump(results, f, indent=2)
+
+    print(f"\n{'Rows':>12} {'Fact rows':>12} {'ETL (s)':>9} {'Rows/s':>12} {'Max RSS (MB)':>13}")
+    for r in results:
+        print(f"{r['rows']:>12} {r['fact_rows']:>12} {r['etl_seconds']:>9.2f} {r['rows_per_sec']:>12,.0f} {r['max_rss_mb']:>13.0f}")
+    print(f"Results saved to: {RESULTS_FILE}")
+    plot_scaling(results)
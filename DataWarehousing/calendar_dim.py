@@ -0,0 +1,91 @@
+import pandas as pd
+import numpy as np
+import os
+
+# Define paths
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+# Kept with the other reusable intermediates (gitignored)
+CALENDAR_FILE = os.path.join(BASE_DIR, '..', 'DataWarehousing', 'staging', 'calendar.npz')
+
+# Index = days since Monday; 1970-01-01 (day 0 of datetime64[D]) was a Thursday
+DAY_NAMES = np.array(['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday'], dtype=object)
+EPOCH_WEEKDAY = 3
+
+COLUMNS = ['date', 'time_id', 'day', 'month', 'year', 'quarter', 'weekday']
+
+# Calendars already loaded in this process, by file
+_loaded = {}
+
+def make_calendar(start, end):
+    """Calendar arrays for every day from start to end (datetime64[D], inclusive), by NumPy arithmetic."""
+    days = np.arange(start, end + np.timedelta64(1, 'D'), dtype='datetime64[D]')
+    months = days.astype('datetime64[M]')
+    year = months.astype('datetime64[Y]').astype(np.int64) + 1970
+    month = months.astype(np.int64) % 12 + 1
+    day = (days - months).astype(np.int64) + 1
+    return {
+        'date': days,
+        'time_id': year * 10000 + month * 100 + day,
+        'day': day.astype(np.int8),
+        'month': month.astype(np.int8),
+        'year': year.astype(np.int16),
+        'quarter': ((month - 1) // 3 + 1).astype(np.int8),
+        'weekday': ((days.astype(np.int64) + EPOCH_WEEKDAY) % 7).astype(np.int8),
+    }
+
+def load_calendar(path=CALENDAR_FILE):
+    """The persisted calendar, or None if there is none yet."""
+    if path in _loaded:
+        return _loaded[path]
+    if not os.path.exists(path):
+        return None
+    with np.load(path) as f:
+        calendar = {col: f[col] for col in COLUMNS}
+    _loaded[path] = calendar
+    return calendar
+
+def save_calendar(calendar, path=CALENDAR_FILE):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp.npz'
+    np.savez(tmp_path, **calendar)
+    os.replace(tmp_path, path)
+    _loaded[path] = calendar
+
+def ensure_calendar(first_date, last_date, path=CALENDAR_FILE):
+    """Calendar covering first_date..last_date, extended by whole years only when a date falls outside it."""
+    first = np.datetime64(first_date, 'D').astype('datetime64[Y]').astype('datetime64[D]')
+    last = (np.datetime64(last_date, 'D').astype('datetime64[Y]') + 1).astype('datetime64[D]') - np.timedelta64(1, 'D')
+    calendar = load_calendar(path)
+    if calendar is None:
+        calendar = make_calendar(first, last)
+        print(f"Calendar generated for {first} to {last}.")
+    else:
+        start, end = calendar['date'][0], calendar['date'][-1]
+        if first >= start and last <= end:
+            return calendar
+        before = make_calendar(first, start - np.timedelta64(1, 'D')) if first < start else None
+        after = make_calendar(end + np.timedelta64(1, 'D'), last) if last > end else None
+        calendar = {col: np.concatenate([part[col] for part in (before, calendar, after) if part is not None])
+                    for col in COLUMNS}
+        print(f"Calendar extended to {calendar['date'][0]} to {calendar['date'][-1]}.")
+    save_calendar(calendar, path)
+    return calendar
+
+def calendar_rows(dates, path=CALENDAR_FILE):
+    """TimeDim rows for the given dates (in that order), looked up in the persisted calendar."""
+    days = np.asarray(pd.to_datetime(pd.Series(dates)).to_numpy(), dtype='datetime64[D]')
+    if len(days) == 0:
+        calendar = make_calendar(np.datetime64('1970-01-01'), np.datetime64('1969-12-31'))
+        rows = np.empty(0, dtype=np.int64)
+    else:
+        calendar = ensure_calendar(days.min(), days.max(), path)
+        rows = (days - calendar['date'][0]).astype(np.int64)
+    return pd.DataFrame({
+        'full_date': calendar['date'][rows].astype('datetime64[s]'),
+        'time_id': calendar['time_id'][rows],
+        'day': calendar['day'][rows],
+        'month': calendar['month'][rows],
+        'year': calendar['year'][rows],
+        'quarter': calendar['quarter'][rows],
+        'day_of_week': DAY_NAMES[calendar['weekday'][rows]],
+    })
@@ -0,0 +1,125 @@
+import json
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError: # Windows
+    resource = None
+
+def _cpu_seconds():
+    """User + system CPU time of this process and its finished children (e.g. pool workers)."""
+    t = os.times()
+    return t.user + t.system + t.children_user + t.children_system
+
+def _max_rss_mb():
+    """Process peak resident set size so far, in MB (None where unavailable)."""
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024
+
+class RunMetrics:
+    """Records wall time, CPU time, peak memory and row counts of ETL stages.
+
+    Stages nest: a stage opened inside another is recorded as "outer/inner". Disabled
+    (the default) every stage is a no-op, so instrumented code costs nothing when no
+    report was requested.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.trace_memory = False
+        self.profile_dir = None
+        self.records = []
+        self._stack = []
+        self._started = None
+
+    def enable(self, trace_memory=True, profile_dir=None):
+        """Start recording. trace_memory uses tracemalloc for per-stage peaks (slower);
+        profile_dir gets a cProfile dump per top-level stage."""
+        self.enabled = True
+        self.trace_memory = trace_memory
+        self.profile_dir = profile_dir
+        self.records = []
+        self._started = time.time()
+        if profile_dir:
+            os.makedirs(profile_dir, exist_ok=True)
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextmanager
+    def stage(self, name, rows_in=None):
+        """Time the enclosed block. Yields a dict; set its 'rows_out' (or 'rows_in') as known."""
+        record = {'rows_in': rows_in, 'rows_out': None}
+        if not self.enabled:
+            yield record
+            return
+
+        parent = self._stack[-1] if self._stack else None
+        record['name'] = f"{parent['name']}/{name}" if parent else name
+        record['depth'] = len(self._stack)
+        if self.trace_memory:
+            # tracemalloc keeps one global peak: fold it into the parent before resetting for this stage
+            if parent is not None:
+                parent['_peak'] = max(parent['_peak'], tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+            record['_peak'] = 0
+        profiler = None
+        if self.profile_dir and parent is None:
+            import cProfile
+            profiler = cProfile.Profile()
+        self._stack.append(record)
+        self.records.append(record)
+
+        wall, cpu = time.perf_counter(), _cpu_seconds()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield record
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                profiler.dump_stats(os.path.join(self.profile_dir, f"{record['name'].replace('/', '.')}.prof"))
+            record['wall_s'] = round(time.perf_counter() - wall, 6)
+            record['cpu_s'] = round(_cpu_seconds() - cpu, 6)
+            record['max_rss_mb'] = _max_rss_mb()
+            self._stack.pop()
+            if self.trace_memory:
+                peak = max(record.pop('_peak'), tracemalloc.get_traced_memory()[1])
+                record['peak_traced_mb'] = round(peak / (1024 * 1024), 3)
+                if parent is not None:
+                    parent['_peak'] = max(parent['_peak'], peak)
+                tracemalloc.reset_peak()
+
+    def report(self):
+        """The run report as a dict (stages in the order they started)."""
+        keys = ['name', 'depth', 'wall_s', 'cpu_s', 'peak_traced_mb', 'max_rss_mb', 'rows_in', 'rows_out']
+        return {
+            'started_at': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self._started)) if self._started else None,
+            'argv': sys.argv,
+            'python': sys.version.split()[0],
+            'trace_memory': self.trace_memory,
+            'stages': [{k: r.get(k) for k in keys} for r in self.records],
+        }
+
+    def write_report(self, path):
+        """Write the run report as JSON and print a short summary of the top-level stages."""
+        report = self.report()
+        with open(path, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n{'Stage':<40} {'Wall (s)':>9} {'CPU (s)':>9} {'Rows out':>10}")
+        for r in report['stages']:
+            if r['depth'] <= 1 and r['wall_s'] is not None:
+                name = '  ' * r['depth'] + r['name'].split('/')[-1]
+                rows = '' if r['rows_out'] is None else r['rows_out']
+                print(f"{name[:40]:<40} {r['wall_s']:>9.3f} {r['cpu_s']:>9.3f} {rows:>10}")
+        print(f"Run report written to: {path}")
+        return report
+
+# Shared recorder for the pipeline scripts (disabled until enable() is called)
+metrics = RunMetrics()
@@ -1,10 +1,19 @@
 import pandas as pd
+import argparse
 import os
 import sqlite3
+import sys
+import time
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
 from datetime import datetime, timedelta
+from itertools import islice
+
+from calendar_dim import calendar_rows
+from etl_metrics import metrics
+from fact_partitions import GRAINS, fact_index_sql, insert_facts, is_partitioned, partition_sales_fact, route_query
+from olap_aggregates import refresh_aggregates, rollup_sales
+from olap_sql import load_olap_queries
+from product_search import build_product_search
 
 # Define paths
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -12,6 +21,23 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DATA_FILE = os.path.join(BASE_DIR, '..', 'Copy of Online Retail.csv')
 DB_FILE = os.path.join(BASE_DIR, '..', 'DataWarehousing', 'retail_dw.db')
 SCHEMA_FILE = os.path.join(BASE_DIR, '..', 'DataWarehousing', 'warehouse_schema.sql')
+INDEX_FILE = os.path.join(BASE_DIR, '..', 'DataWarehousing', 'warehouse_indexes.sql')
+# Home of the shared chart cache (charts.py); normalized so it matches pipeline.py's entry
+CHARTS_DIR = os.path.normpath(os.path.join(BASE_DIR, '..', 'DataMining'))
+
+# Simulate current date as August 12, 2025 (see transform_data)
+TARGET_DATE = pd.Timestamp('2025-08-12')
+# Rows per chunk in streaming mode
+CHUNK_SIZE = 100_000
+# Rows per executemany call in the bulk loader
+BULK_BATCH_SIZE = 50_000
+# Dimensions before facts
+LOAD_ORDER = ['CustomerDim', 'ProductDim', 'TimeDim', 'SalesFact', 'LoadState']
+# Typed ingest schema for extract_data: repetitive strings as categoricals (codes are always
+# read as strings); numeric columns are downcast after the read where lossless
+INGEST_DTYPES = {'InvoiceNo': 'category', 'StockCode': 'category', 'Description': 'category', 'Country': 'category'}
+# InvoiceDate as in the source file, e.g. '12/1/2010 8:26'
+INVOICE_DATE_FORMAT = '%m/%d/%Y %H:%M'
 
 def init_db():
     """Initialize the database with schema."""
@@ -19,6 +45,10 @@ def init_db():
     if os.path.exists(DB_FILE):
         os.remove(DB_FILE)
         print("Removed existing database file.")
+    # A leftover WAL (e.g. from an open OlapService) would otherwise be replayed onto the new file
+    for suffix in ('-wal', '-shm'):
+        if os.path.exists(DB_FILE + suffix):
+            os.remove(DB_FILE + suffix)
     try:
         with open(SCHEMA_FILE, 'r') as f:
             schema_sql = f.read()
@@ -32,15 +62,43 @@ def init_db():
     except Exception as e:
         print(f"Error initializing DB: {e}")
 
-def extract_data(file_path):
-    """Task 2.2: Extract Phase"""
+def read_retail_csv(file_path, encoding, compact=True):
+    """read_csv with the typed ingest schema (compact=True) or pandas' default dtypes."""
+    if not compact:
+        return pd.read_csv(file_path, encoding=encoding)
+    df = pd.read_csv(file_path, encoding=encoding, dtype=INGEST_DTYPES,
+                     parse_dates=['InvoiceDate'], date_format=INVOICE_DATE_FORMAT)
+    for col, dtype in INGEST_DTYPES.items():
+        if dtype == 'category':
+            # Sorted categories keep factorize(sort=True) and groupby in the same order as plain strings
+            df[col] = df[col].cat.reorder_categories(df[col].cat.categories.sort_values())
+    df['Quantity'] = pd.to_numeric(df['Quantity'], downcast='integer')
+    df['UnitPrice'] = downcast_float(df['UnitPrice'])
+    # Whole-number IDs with gaps: a nullable integer instead of float64
+    if df['CustomerID'].dropna().mod(1).eq(0).all():
+        df['CustomerID'] = pd.to_numeric(df['CustomerID'].astype('Int64'), downcast='integer')
+    return df
+
+def downcast_float(s):
+    """s as float32 if that round-trips every value exactly, else unchanged."""
+    small = s.astype('float32')
+    if (small.astype('float64') == s).sum() == s.notna().sum():
+        return small
+    return s
+
+def extract_data(file_path, compact=True):
+    """Task 2.2: Extract Phase
+
+    compact=True reads with INGEST_DTYPES: categorical strings, the narrowest lossless
+    numeric types and InvoiceDate parsed during the read.
+    """
     print(f"\n--- EXTRACT PHASE ---")
     print(f"Reading data from: {file_path}")
     try:
         try:
-            df = pd.read_csv(file_path, encoding='ISO-8859-1')
+            df = read_retail_csv(file_path, 'ISO-8859-1', compact)
         except UnicodeDecodeError:
-            df = pd.read_csv(file_path, encoding='utf-8')
+            df = read_retail_csv(file_path, 'utf-8', compact)
             
         print(f"Extracted {len(df)} rows.")
         return df
@@ -48,45 +106,121 @@ def extract_data(file_path):
         print(f"Error extraction: {e}")
         return None
 
+def memory_report(file_path):
+    """Per-column memory of the default and the compact extract layouts, in MB."""
+    default = extract_data(file_path, compact=False)
+    compact = extract_data(file_path)
+    report = pd.DataFrame({
+        'default_dtype': default.dtypes.astype(str),
+        'default_mb': default.memory_usage(index=False, deep=True) / 2**20,
+        'compact_dtype': compact.dtypes.astype(str),
+        'compact_mb': compact.memory_usage(index=False, deep=True) / 2**20,
+    })
+    report.loc['Total'] = ['', report['default_mb'].sum(), '', report['compact_mb'].sum()]
+    report['ratio'] = report['default_mb'] / report['compact_mb']
+    print(f"\n--- MEMORY REPORT ({len(default)} rows) ---")
+    print(report.round(2).to_string())
+    return report
+
+def prepare_sales(chunk):
+    """Drop rows without a CustomerID, convert types and add TotalSales (steps 1-3 of transform_data)."""
+    df = chunk.dropna(subset=['CustomerID'])
+    return df.assign(InvoiceDate=pd.to_datetime(df['InvoiceDate']),
+                     CustomerID=df['CustomerID'].astype(int),
+                     TotalSales=df['Quantity'] * df['UnitPrice'])
+
+def filter_sales(df, time_delta, window=True):
+    """Shift InvoiceDate by time_delta and keep valid sales.
+
+    With window=True only the year ending TARGET_DATE is kept; incremental loads pass
+    window=False since new sales fall after it.
+    """
+    # Apply offset to all dates (df is owned by the caller's pipeline, so no copy first)
+    df['InvoiceDate'] = df['InvoiceDate'] + time_delta
+    keep = (df['Quantity'] > 0) & (df['UnitPrice'] > 0)
+    if window:
+        start_date = TARGET_DATE - pd.DateOffset(years=1)
+        keep &= (df['InvoiceDate'] >= start_date) & (df['InvoiceDate'] <= TARGET_DATE)
+    return df[keep]
+
+def date_keys(dates):
+    """time_id (YYYYMMDD) for a datetime Series, computed arithmetically instead of via strftime."""
+    return (dates.dt.year * 10000 + dates.dt.month * 100 + dates.dt.day).astype('int64')
+
+def build_load_state(last_invoice_date, time_delta):
+    """Single-row LoadState recording the high-water mark and date shift of a load."""
+    return pd.DataFrame({
+        'id': [1],
+        'last_invoice_date': [str(last_invoice_date)],
+        'time_shift': [str(time_delta)],
+        'loaded_at': [str(pd.Timestamp.now().floor('s'))],
+    })
+
+def extract_data_chunked(file_path, chunksize=CHUNK_SIZE, usecols=None):
+    """Streaming Extract: yield the CSV in DataFrames of at most chunksize rows."""
+    # Pin the code columns to str: a chunk holding only numeric codes would otherwise be read as int.
+    dtype = {col: str for col in ('InvoiceNo', 'StockCode') if usecols is None or col in usecols}
+    # ISO-8859-1 maps every byte, so the utf-8 fallback of extract_data is never needed here.
+    return pd.read_csv(file_path, encoding='ISO-8859-1', chunksize=chunksize, dtype=dtype, usecols=usecols)
+
+def plain(values):
+    """Categorical values back as their plain dtype (other values unchanged)."""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values.astype(values.cat.categories.dtype)
+    return values
+
+def build_customer_dim(first_country):
+    """CustomerDim from a Series of first Country per CustomerID."""
+    customer_dim = first_country.sort_index().reset_index()
+    customer_dim.columns = ['customer_id', 'country']
+    customer_dim['country'] = plain(customer_dim['country'])
+    customer_dim['source_customer_id'] = customer_dim['customer_id'].astype(str)
+    customer_dim['name'] = 'Customer ' + customer_dim['source_customer_id'] # Placeholder
+    return customer_dim
+
+def build_time_dim(unique_dates):
+    """Day-level TimeDim from an array of unique dates, looked up in the persisted calendar (see calendar_dim.py)."""
+    return calendar_rows(unique_dates)
+
+def build_product_dim(first_description):
+    """ProductDim from a Series of first Description per StockCode."""
+    product_dim = first_description.sort_index().reset_index()
+    product_dim.columns = ['stock_code', 'description']
+    product_dim = product_dim.apply(plain)
+    product_dim['product_id'] = product_dim.index + 1 # Simple auto-increment surrogates
+    product_dim['category'] = 'General' # Placeholder as category isn't in dataset
+    return product_dim
+
 def transform_data(df):
     """Task 2.3: Transform Phase"""
     print(f"\n--- TRANSFORM PHASE ---")
     initial_count = len(df)
     
     # 1. Drop missing CustomerID (User Instruction)
-    print("Dropping rows with missing CustomerID...")
-    df = df.dropna(subset=['CustomerID']).copy()
-    print(f"Rows after dropping missing CustomerID: {len(df)} (Dropped {initial_count - len(df)})")
-    
     # 2. Convert types
-    df['InvoiceDate'] = pd.to_datetime(df['InvoiceDate'])
-    df['CustomerID'] = df['CustomerID'].astype(int) # Clean ID format
-    
     # 3. Calculate TotalSales (Task 2.3.1)
-    df['TotalSales'] = df['Quantity'] * df['UnitPrice']
+    print("Dropping rows with missing CustomerID...")
+    with metrics.stage('prepare_sales', rows_in=initial_count) as m:
+        df = prepare_sales(df)
+        m['rows_out'] = len(df)
+    print(f"Rows after dropping missing CustomerID: {len(df)} (Dropped {initial_count - len(df)})")
     
     # 4. Filter Data (Task 2.3.3)
     # Simulate current date as August 12, 2025.
     # The original dataset is from 2011. We will shift the data to end near Aug 2025 to make it realistic.
     print("Simulating 2025 Data: Shifting dates...")
     max_date = df['InvoiceDate'].max()
-    target_date = pd.Timestamp('2025-08-12')
     # Calculate offset
-    time_delta = target_date - max_date
-    
-    # Apply offset to all dates
-    df['InvoiceDate'] = df['InvoiceDate'] + time_delta
+    time_delta = TARGET_DATE - max_date
     
     # Filter for last year (Aug 12, 2024 - Aug 12, 2025)
-    start_date = target_date - pd.DateOffset(years=1)
-    print(f"Filtering data between {start_date.date()} and {target_date.date()}...")
-    
-    df = df[(df['InvoiceDate'] >= start_date) & (df['InvoiceDate'] <= target_date)]
-    
+    start_date = TARGET_DATE - pd.DateOffset(years=1)
+    print(f"Filtering data between {start_date.date()} and {TARGET_DATE.date()}...")
     # Remove rows with Quantity < 0 (returns) or UnitPrice <= 0
     print("Filtering invalid quantities and prices...")
-    df = df[df['Quantity'] > 0]
-    df = df[df['UnitPrice'] > 0]
+    with metrics.stage('filter_sales', rows_in=len(df)) as m:
+        df = filter_sales(df, time_delta)
+        m['rows_out'] = len(df)
     print(f"Rows after filtering: {len(df)}")
     
     # 5. Extract Dimensions
@@ -95,70 +229,134 @@ def transform_data(df):
     # Group by CustomerID to get unique customers
     # We take the first occurrence of Country for each customer
     print("Extracting Customer Dimension...")
-    customer_dim = df.groupby('CustomerID').agg({
-        'Country': 'first'
-    }).reset_index()
-    customer_dim.columns = ['customer_id', 'country']
-    customer_dim['source_customer_id'] = customer_dim['customer_id'].astype(str)
-    customer_dim['name'] = 'Customer ' + customer_dim['source_customer_id'] # Placeholder
+    with metrics.stage('customer_dim', rows_in=len(df)) as m:
+        customer_dim = build_customer_dim(df.groupby('CustomerID')['Country'].first())
+        m['rows_out'] = len(customer_dim)
     
     # Time Dimension
     print("Extracting Time Dimension...")
-    # Extract unique dates (ignoring time for the dimension, or keeping time if granulated)
-    # Schema has a TimeDim. Let's create a Day-level dimension or Timestamp level?
-    # Schema says: time_id, full_date, day, month, year, quarter...
-    # Let's create dimensions based on the InvoiceDate (Date part)
-    unique_dates = df['InvoiceDate'].dt.date.unique()
-    time_dim = pd.DataFrame({'full_date': unique_dates})
-    time_dim['full_date'] = pd.to_datetime(time_dim['full_date'])
-    time_dim['time_id'] = time_dim['full_date'].dt.strftime('%Y%m%d').astype(int)
-    time_dim['day'] = time_dim['full_date'].dt.day
-    time_dim['month'] = time_dim['full_date'].dt.month
-    time_dim['year'] = time_dim['full_date'].dt.year
-    time_dim['quarter'] = time_dim['full_date'].dt.quarter
-    time_dim['day_of_week'] = time_dim['full_date'].dt.day_name()
+    # Day-level dimension based on the InvoiceDate (Date part)
+    with metrics.stage('time_dim', rows_in=len(df)) as m:
+        time_dim = build_time_dim(df['InvoiceDate'].dt.normalize().unique())
+        m['rows_out'] = len(time_dim)
     
     # Product Dimension
     print("Extracting Product Dimension...")
-    # Group by StockCode
-    product_dim = df.groupby('StockCode').agg({
-        'Description': 'first'
-    }).reset_index()
-    product_dim.columns = ['stock_code', 'description']
-    product_dim['product_id'] = product_dim.index + 1 # Simple auto-increment surrogates
-    product_dim['category'] = 'General' # Placeholder as category isn't in dataset
+    # Sorted integer codes per StockCode: code + 1 is the product_id, same order as groupby('StockCode')
+    with metrics.stage('product_dim', rows_in=len(df)) as m:
+        product_codes, stock_codes = pd.factorize(df['StockCode'], sort=True)
+        first_description = df['Description'].groupby(product_codes).first()
+        product_dim = build_product_dim(pd.Series(first_description.to_numpy(), index=stock_codes))
+        m['rows_out'] = len(product_dim)
     
     # Prepare Sales Fact
     print("Preparing Sales Fact Table...")
-    # We need to map the original data to the new Surrogate Keys
-    
-    # Map Product ID
-    fact_table = df.merge(product_dim[['stock_code', 'product_id']], left_on='StockCode', right_on='stock_code', how='left')
-    
-    # Map Time ID (based on date)
-    fact_table['date_key'] = fact_table['InvoiceDate'].dt.date
-    # Convert date_key in fact_table to match time_dim['full_date'] type if needed, but logic below is simpler:
-    # time_id construction:
-    fact_table['time_id'] = fact_table['InvoiceDate'].dt.strftime('%Y%m%d').astype(int)
-    
-    # Customer ID is already the key (using actual ID as key or mapping? Schema has customer_id as PK)
-    # Let's use the explicit CustomerID from CSV as the Link for now, assuming CustomerDim uses it as PK or we map it.
-    # In my logic above: customer_dim['customer_id'] IS the CSV CustomerID.
-    # So we can rename it to match schema expectation if needed. 
-    # Schema: customer_id INTEGER PRIMARY KEY
-    # So we can just use the CSV ID as the ID if unique.
-    
-    # Select final columns for Fact
-    sales_fact = fact_table[[
-        'CustomerID', 'product_id', 'time_id', 'InvoiceNo', 'Quantity', 'UnitPrice', 'TotalSales'
-    ]].copy()
-    sales_fact.columns = ['customer_id', 'product_id', 'time_id', 'invoice_no', 'quantity', 'unit_price', 'total_sales']
+    # Surrogate keys come from array lookups: product_id from the codes above, time_id from the date parts.
+    # customer_dim['customer_id'] IS the CSV CustomerID, so it is used as the key directly.
+    with metrics.stage('sales_fact_keys', rows_in=len(df)) as m:
+        sales_fact = pd.DataFrame({
+            'customer_id': df['CustomerID'].to_numpy(),
+            'product_id': product_codes + 1,
+            'time_id': date_keys(df['InvoiceDate']).to_numpy(),
+            'invoice_no': df['InvoiceNo'].to_numpy(),
+            'quantity': df['Quantity'].to_numpy(),
+            'unit_price': df['UnitPrice'].to_numpy(),
+            'total_sales': df['TotalSales'].to_numpy(),
+        })
+        m['rows_out'] = len(sales_fact)
     
     return {
         'CustomerDim': customer_dim,
         'ProductDim': product_dim,
         'TimeDim': time_dim,
-        'SalesFact': sales_fact
+        'SalesFact': sales_fact,
+        'LoadState': build_load_state(max_date, time_delta)
+    }
+
+def _transform_partition(args):
+    """Worker for transform_data_parallel: clean one CustomerID partition and reduce it to key pieces.
+
+    The index of part is the row position in the full input and is carried through so the
+    parent can restore source order and "first" semantics.
+    """
+    part, time_delta = args
+    df = filter_sales(prepare_sales(part), time_delta)
+    product_codes, stock_codes = pd.factorize(df['StockCode'], sort=True)
+    dates = df['InvoiceDate'].dt.normalize()
+    described = df['Description'].notna()
+    return {
+        'fact': pd.DataFrame({
+            'customer_id': df['CustomerID'].to_numpy(),
+            'product_code': product_codes,
+            'time_id': date_keys(df['InvoiceDate']).to_numpy(),
+            'invoice_no': df['InvoiceNo'].to_numpy(),
+            'quantity': df['Quantity'].to_numpy(),
+            'unit_price': df['UnitPrice'].to_numpy(),
+            'total_sales': df['TotalSales'].to_numpy(),
+        }, index=df.index),
+        'stock_codes': np.asarray(stock_codes),
+        # Every row of a customer is in this partition, so the local first Country is the global one
+        'first_country': df.groupby('CustomerID')['Country'].first(),
+        # First described row per StockCode and first row per date, with their source positions
+        'descriptions': df.loc[described, ['StockCode', 'Description']].drop_duplicates('StockCode'),
+        'dates': pd.Series(dates.index, index=dates.to_numpy()).groupby(level=0).min(),
+    }
+
+def transform_data_parallel(df, workers=None):
+    """Task 2.3 (parallel): transform_data split by hash of CustomerID across a process pool.
+
+    Returns the same tables as transform_data. The date-shift anchor is found from the
+    unique InvoiceDate values up front; each worker then cleans its partition and the
+    dimension pieces are merged by source row position, so "first" Country/Description
+    and the TimeDim row order match the single-process run.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    
+    workers = workers or os.cpu_count()
+    print(f"\n--- TRANSFORM PHASE (parallel, {workers} workers) ---")
+    initial_count = len(df)
+    df = df.dropna(subset=['CustomerID']).reset_index(drop=True)
+    print(f"Rows after dropping missing CustomerID: {len(df)} (Dropped {initial_count - len(df)})")
+    
+    # Parsing each distinct timestamp once is far cheaper than parsing every row
+    with metrics.stage('find_max_date', rows_in=len(df)):
+        max_date = pd.to_datetime(pd.Series(df['InvoiceDate'].unique())).max()
+    time_delta = TARGET_DATE - max_date
+    
+    partition = df['CustomerID'].astype('int64').to_numpy() % workers
+    jobs = [(df[partition == i], time_delta) for i in range(workers)]
+    with metrics.stage('partition_workers', rows_in=len(df)) as m:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pieces = list(pool.map(_transform_partition, jobs))
+        m['rows_out'] = sum(len(p['fact']) for p in pieces)
+    
+    # Product Dimension: global sorted StockCodes, first description by source position
+    stock_codes = np.unique(np.concatenate([p['stock_codes'] for p in pieces]).astype(object))
+    descriptions = pd.concat([p['descriptions'] for p in pieces]).sort_index().drop_duplicates('StockCode')
+    first_description = descriptions.set_index('StockCode')['Description'].reindex(stock_codes)
+    product_dim = build_product_dim(first_description)
+    
+    # Customer and Time Dimensions
+    customer_dim = build_customer_dim(pd.concat([p['first_country'] for p in pieces]))
+    dates = pd.concat([p['dates'] for p in pieces]).groupby(level=0).min().sort_values()
+    time_dim = build_time_dim(dates.index.to_numpy())
+    
+    # Sales Fact: map partition-local product codes to global ones, then restore source order
+    facts = []
+    for p in pieces:
+        fact = p['fact']
+        to_global = np.searchsorted(stock_codes, p['stock_codes'].astype(object))
+        facts.append(fact.assign(product_code=to_global[fact['product_code'].to_numpy()] + 1))
+    sales_fact = pd.concat(facts).sort_index(kind='stable').reset_index(drop=True)
+    sales_fact = sales_fact.rename(columns={'product_code': 'product_id'})
+    print(f"Rows after filtering: {len(sales_fact)}")
+    
+    return {
+        'CustomerDim': customer_dim,
+        'ProductDim': product_dim,
+        'TimeDim': time_dim,
+        'SalesFact': sales_fact,
+        'LoadState': build_load_state(max_date, time_delta)
     }
 
 def load_data(data_dict):
@@ -175,15 +373,18 @@ def load_data(data_dict):
         print("Loading CustomerDim...")
         # Schema: customer_id, source_customer_id, name, country, city
         # Our DF: customer_id, country, source_customer_id, name
-        data_dict['CustomerDim'].to_sql('CustomerDim', conn, if_exists='append', index=False)
+        with metrics.stage('to_sql CustomerDim', rows_in=len(data_dict['CustomerDim'])):
+            data_dict['CustomerDim'].to_sql('CustomerDim', conn, if_exists='append', index=False)
         
         print("Loading ProductDim...")
         # Schema: product_id, stock_code, description, category
-        data_dict['ProductDim'].to_sql('ProductDim', conn, if_exists='append', index=False)
+        with metrics.stage('to_sql ProductDim', rows_in=len(data_dict['ProductDim'])):
+            data_dict['ProductDim'].to_sql('ProductDim', conn, if_exists='append', index=False)
         
         print("Loading TimeDim...")
         # Schema: time_id, full_date, day, month, year, quarter, day_of_week
-        data_dict['TimeDim'].to_sql('TimeDim', conn, if_exists='append', index=False)
+        with metrics.stage('to_sql TimeDim', rows_in=len(data_dict['TimeDim'])):
+            data_dict['TimeDim'].to_sql('TimeDim', conn, if_exists='append', index=False)
         
         # Load Fact
         print("Loading SalesFact...")
@@ -191,63 +392,531 @@ def load_data(data_dict):
         # Since sale_id is AUTOINCREMENT, we don't allow it to be in the dataframe, or we don't index=False if we want pandas to help?
         # Better to just not include sale_id column and let SQLite handle it.
         # Ensure our DF column order matches what we want, or simple append works if names match.
-        data_dict['SalesFact'].to_sql('SalesFact', conn, if_exists='append', index=False)
+        with metrics.stage('to_sql SalesFact', rows_in=len(data_dict['SalesFact'])):
+            data_dict['SalesFact'].to_sql('SalesFact', conn, if_exists='append', index=False)
+        
+        # High-water mark for later incremental loads
+        with metrics.stage('to_sql LoadState', rows_in=len(data_dict['LoadState'])):
+            data_dict['LoadState'].to_sql('LoadState', conn, if_exists='append', index=False)
+        
+        # Materialized roll-ups (see olap_aggregates.py)
+        print("Building aggregate tables...")
+        with metrics.stage('refresh_aggregates') as m:
+            m['rows_in'] = refresh_aggregates(conn)
+            conn.commit()
+        
+        # Full-text index for keyword slices (see product_search.py)
+        with metrics.stage('build_product_search', rows_in=len(data_dict['ProductDim'])):
+            build_product_search(conn)
+            conn.commit()
+        
+        print("Data Loading Complete.")
+        
+    except Exception as e:
+        print(f"Error loading data: {e}")
+    finally:
+        conn.close()
+
+def _row_tuples(df):
+    """Plain Python row tuples for executemany. Datetimes become text as with to_sql; NaN binds as NULL."""
+    columns = []
+    for col in df.columns:
+        values = df[col]
+        if pd.api.types.is_datetime64_any_dtype(values):
+            values = values.dt.strftime('%Y-%m-%d %H:%M:%S')
+        columns.append(values.tolist())
+    return zip(*columns)
+
+def _insert_rows(conn, table, df, batch_size=BULK_BATCH_SIZE):
+    """INSERT the rows of df into table with executemany, batch_size rows at a time. Does not commit."""
+    sql = f"INSERT INTO {table} ({', '.join(df.columns)}) VALUES ({', '.join('?' * len(df.columns))})"
+    rows = _row_tuples(df)
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            break
+        conn.executemany(sql, batch)
+
+def bulk_load_data(data_dict, batch_size=BULK_BATCH_SIZE):
+    """Task 2.4 (fast path): Load with executemany, one transaction per table.
+
+    Journaling and fsync are relaxed while loading (init_db rebuilds the file anyway) and
+    foreign keys are checked once at the end instead of per row. Returns rows and
+    rows/second per table.
+    """
+    print(f"\n--- LOAD PHASE (bulk) ---")
+    conn = sqlite3.connect(DB_FILE, isolation_level=None)
+    stats = {}
+    
+    try:
+        journal_mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+        conn.execute("PRAGMA foreign_keys = OFF")
+        conn.execute("PRAGMA journal_mode = MEMORY")
+        conn.execute("PRAGMA synchronous = OFF")
+        conn.execute("PRAGMA cache_size = -262144") # 256 MB (negative means KiB)
+        conn.execute("PRAGMA temp_store = MEMORY")
+        
+        for table in LOAD_ORDER:
+            df = data_dict[table]
+            start = time.perf_counter()
+            with metrics.stage(f'insert {table}', rows_in=len(df)):
+                conn.execute("BEGIN")
+                _insert_rows(conn, table, df, batch_size)
+                conn.execute("COMMIT")
+            elapsed = time.perf_counter() - start
+            rate = len(df) / elapsed if elapsed > 0 else float('inf')
+            stats[table] = {'rows': len(df), 'seconds': elapsed, 'rows_per_sec': rate}
+            print(f"Loaded {table}: {len(df)} rows in {elapsed:.2f}s ({rate:,.0f} rows/s)")
         
+        violations = conn.execute("PRAGMA foreign_key_check").fetchall()
+        if violations:
+            print(f"Warning: {len(violations)} foreign key violations, e.g. {violations[0]}")
+        else:
+            print("Foreign key check passed.")
+        
+        start = time.perf_counter()
+        with metrics.stage('refresh_aggregates') as m:
+            conn.execute("BEGIN")
+            m['rows_in'] = refresh_aggregates(conn)
+            conn.execute("COMMIT")
+        print(f"Built aggregate tables in {time.perf_counter() - start:.2f}s")
+        with metrics.stage('build_product_search', rows_in=len(data_dict['ProductDim'])):
+            conn.execute("BEGIN")
+            build_product_search(conn)
+            conn.execute("COMMIT")
+        conn.execute(f"PRAGMA journal_mode = {journal_mode}")
         print("Data Loading Complete.")
         
     except Exception as e:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
         print(f"Error loading data: {e}")
     finally:
         conn.close()
+    return stats
+
+def stream_etl(file_path, chunksize=CHUNK_SIZE):
+    """Chunked Extract/Transform/Load for inputs larger than memory.
+
+    Produces the same tables as transform_data + load_data. Pass 1 finds the latest
+    InvoiceDate (the date shift anchor); pass 2 cleans each chunk, keeps the first
+    Country/Description per key in dictionaries and stages fact rows in SQLite. ProductDim
+    keys follow sorted StockCode order, so staged facts are mapped to product_id once
+    every chunk has been seen.
+    """
+    print(f"\n--- STREAMING ETL (chunksize={chunksize}) ---")
+    max_date = None
+    for chunk in extract_data_chunked(file_path, chunksize, usecols=['InvoiceDate', 'CustomerID']):
+        dates = pd.to_datetime(chunk.loc[chunk['CustomerID'].notna(), 'InvoiceDate'])
+        if len(dates) and (max_date is None or dates.max() > max_date):
+            max_date = dates.max()
+    if max_date is None:
+        print("No rows with a CustomerID found.")
+        return
+    time_delta = TARGET_DATE - max_date
+
+    countries = {}     # CustomerID -> first non-null Country
+    descriptions = {}  # StockCode -> first non-null Description
+    dates = {}         # date -> None, kept in order of first appearance
+    rows_in = rows_out = 0
+    conn = sqlite3.connect(DB_FILE)
+    try:
+        conn.execute("DROP TABLE IF EXISTS SalesFactStaging")
+        conn.execute("""
+            CREATE TABLE SalesFactStaging (
+                customer_id INTEGER, stock_code TEXT, time_id INTEGER, invoice_no TEXT,
+                quantity INTEGER, unit_price REAL, total_sales REAL
+            )""")
+        for chunk in extract_data_chunked(file_path, chunksize):
+            rows_in += len(chunk)
+            df = filter_sales(prepare_sales(chunk), time_delta)
+            if df.empty:
+                continue
+            rows_out += len(df)
+
+            # groupby(...).first() skips nulls, so a key whose value is still null is updated later
+            for key, value in df.groupby('CustomerID', sort=False)['Country'].first().items():
+                if pd.isna(countries.get(key)):
+                    countries[key] = value
+            for key, value in df.groupby('StockCode', sort=False)['Description'].first().items():
+                if pd.isna(descriptions.get(key)):
+                    descriptions[key] = value
+            dates.update(dict.fromkeys(df['InvoiceDate'].dt.date.unique()))
+
+            staged = pd.DataFrame({
+                'customer_id': df['CustomerID'],
+                'stock_code': df['StockCode'],
+                'time_id': date_keys(df['InvoiceDate']),
+                'invoice_no': df['InvoiceNo'],
+                'quantity': df['Quantity'],
+                'unit_price': df['UnitPrice'],
+                'total_sales': df['TotalSales'],
+            })
+            staged.to_sql('SalesFactStaging', conn, if_exists='append', index=False)
+            print(f"Processed {rows_in} rows ({rows_out} kept)...")
+
+        print("Loading dimensions...")
+        build_customer_dim(pd.Series(countries, dtype=object)).to_sql('CustomerDim', conn, if_exists='append', index=False)
+        build_product_dim(pd.Series(descriptions, dtype=object)).to_sql('ProductDim', conn, if_exists='append', index=False)
+        build_time_dim(list(dates)).to_sql('TimeDim', conn, if_exists='append', index=False)
+        build_load_state(max_date, time_delta).to_sql('LoadState', conn, if_exists='append', index=False)
+
+        print("Loading SalesFact...")
+        conn.execute("""
+            INSERT INTO SalesFact (customer_id, product_id, time_id, invoice_no, quantity, unit_price, total_sales)
+            SELECT s.customer_id, p.product_id, s.time_id, s.invoice_no, s.quantity, s.unit_price, s.total_sales
+            FROM SalesFactStaging s
+            JOIN ProductDim p ON p.stock_code = s.stock_code
+            ORDER BY s.rowid
+        """)
+        conn.execute("DROP TABLE SalesFactStaging")
+        refresh_aggregates(conn)
+        build_product_search(conn)
+        conn.commit()
+        print(f"Streaming ETL Complete: {rows_in} rows read, {rows_out} loaded.")
+    except Exception as e:
+        print(f"Error in streaming ETL: {e}")
+    finally:
+        conn.close()
+
+def drop_loaded_lines(conn, df, boundary):
+    """df without the sales lines of the boundary minute that SalesFact already holds.
+
+    InvoiceDate only has minute precision, so lines sharing the high-water mark's minute
+    can reach the source after it was loaded. Lines are matched on invoice, StockCode,
+    quantity and unit price as a multiset: a line that appears twice in an invoice is
+    kept once when one copy is already loaded.
+    """
+    at_boundary = df['InvoiceDate'] == boundary
+    if not at_boundary.any():
+        return df
+    edge = df[at_boundary]
+    invoices = edge['InvoiceNo'].astype(str).unique().tolist()
+    loaded = pd.read_sql_query(f"""
+        SELECT f.invoice_no, p.stock_code, f.quantity, f.unit_price
+        FROM SalesFact f JOIN ProductDim p ON f.product_id = p.product_id
+        WHERE f.time_id = ? AND f.invoice_no IN ({', '.join('?' * len(invoices))})
+    """, conn, params=[int(date_keys(edge['InvoiceDate']).iloc[0])] + invoices)
+    key = ['invoice_no', 'stock_code', 'quantity', 'unit_price']
+    lines = pd.DataFrame({
+        'invoice_no': edge['InvoiceNo'].astype(str).to_numpy(),
+        'stock_code': edge['StockCode'].astype(str).to_numpy(),
+        'quantity': edge['Quantity'].astype('int64').to_numpy(),
+        'unit_price': edge['UnitPrice'].astype('float64').round(6).to_numpy(),
+    })
+    loaded['unit_price'] = loaded['unit_price'].round(6)
+    # The n-th copy of a line is already loaded if SalesFact holds more than n copies
+    copy = lines.groupby(key).cumcount()
+    held = lines.join(loaded.groupby(key).size().rename('held'), on=key)['held'].fillna(0)
+    return df.drop(edge.index[(copy < held).to_numpy()])
+
+def incremental_load(file_path, chunksize=CHUNK_SIZE):
+    """Append only the sales newer than the stored high-water mark.
+
+    The high-water mark's own minute is read again and its lines already in SalesFact
+    are skipped (see drop_loaded_lines), so late lines of that minute are not lost.
+
+    Existing surrogate keys are kept: new customers and dates get their natural keys,
+    new StockCodes get product_ids after the current maximum. A dimension row already
+    in the warehouse is only updated when its Country/Description is still NULL
+    (the "first" value it would have had). Dimensions, facts and the new high-water
+    mark are written in a single transaction.
+    """
+    print(f"\n--- INCREMENTAL LOAD ---")
+    conn = sqlite3.connect(DB_FILE)
+    try:
+        state = conn.execute("SELECT last_invoice_date, time_shift FROM LoadState WHERE id = 1").fetchone()
+        if state is None:
+            print("No previous load recorded. Run a full load first.")
+            return
+        watermark, time_delta = pd.Timestamp(state[0]), pd.Timedelta(state[1])
+        print(f"High-water mark: {watermark}")
+
+        new_chunks = []
+        for chunk in extract_data_chunked(file_path, chunksize):
+            df = prepare_sales(chunk)
+            new_chunks.append(df[df['InvoiceDate'] >= watermark])
+        df = pd.concat(new_chunks, ignore_index=True)
+        if df.empty:
+            print("No new sales since the last load.")
+            return
+        new_watermark = df['InvoiceDate'].max()
+        df = drop_loaded_lines(conn, filter_sales(df, time_delta, window=False), watermark + time_delta)
+        if df.empty:
+            print("No new sales since the last load.")
+            return
+        print(f"New rows to load: {len(df)}")
+
+        changes = conn.total_changes
+
+        # Customer Dimension
+        customer_dim = build_customer_dim(df.groupby('CustomerID')['Country'].first())
+        existing = pd.read_sql_query("SELECT customer_id, country FROM CustomerDim", conn)
+        is_new = ~customer_dim['customer_id'].isin(existing['customer_id'])
+        _insert_rows(conn, 'CustomerDim', customer_dim[is_new])
+        countries_filled = conn.executemany(
+            "UPDATE CustomerDim SET country = ? WHERE customer_id = ? AND country IS NULL",
+            customer_dim.loc[~is_new & customer_dim['country'].notna(), ['country', 'customer_id']]
+            .astype(object).itertuples(index=False, name=None)).rowcount
+        print(f"CustomerDim: {is_new.sum()} new, {countries_filled} with Country filled in")
+
+        # Product Dimension
+        product_dim = build_product_dim(df.groupby('StockCode')['Description'].first())
+        existing = pd.read_sql_query("SELECT stock_code, product_id FROM ProductDim", conn)
+        product_ids = dict(zip(existing['stock_code'], existing['product_id']))
+        is_new = ~product_dim['stock_code'].isin(product_ids)
+        new_products = product_dim[is_new].reset_index(drop=True)
+        new_products['product_id'] = new_products.index + int(existing['product_id'].max() if len(existing) else 0) + 1
+        _insert_rows(conn, 'ProductDim', new_products)
+        product_ids.update(zip(new_products['stock_code'], new_products['product_id']))
+        changed = product_dim[~is_new & product_dim['description'].notna()]
+        conn.executemany(
+            "UPDATE ProductDim SET description = ? WHERE product_id = ? AND description IS NULL",
+            zip(changed['description'], changed['stock_code'].map(product_ids).astype(object)))
+        print(f"ProductDim: {len(new_products)} new")
+
+        # Time Dimension
+        time_dim = build_time_dim(df['InvoiceDate'].dt.date.unique())
+        existing = pd.read_sql_query("SELECT time_id FROM TimeDim", conn)
+        time_dim = time_dim[~time_dim['time_id'].isin(existing['time_id'])]
+        _insert_rows(conn, 'TimeDim', time_dim)
+        print(f"TimeDim: {len(time_dim)} new")
+
+        # Sales Fact
+        sales_fact = pd.DataFrame({
+            'customer_id': df['CustomerID'],
+            'product_id': df['StockCode'].map(product_ids),
+            'time_id': date_keys(df['InvoiceDate']),
+            'invoice_no': df['InvoiceNo'],
+            'quantity': df['Quantity'],
+            'unit_price': df['UnitPrice'],
+            'total_sales': df['TotalSales'],
+        })
+        if is_partitioned(conn):
+            insert_facts(conn, sales_fact.columns, _row_tuples(sales_fact))
+        else:
+            _insert_rows(conn, 'SalesFact', sales_fact)
+
+        state = build_load_state(new_watermark, time_delta)
+        conn.execute("UPDATE LoadState SET last_invoice_date = ?, loaded_at = ? WHERE id = 1",
+                     (state.at[0, 'last_invoice_date'], state.at[0, 'loaded_at']))
+        # Facts already aggregated under a NULL country move when it is filled in
+        refresh_aggregates(conn, rebuild=countries_filled > 0)
+        # New products and filled-in descriptions
+        build_product_search(conn)
+        conn.commit()
+        print(f"Incremental Load Complete: {conn.total_changes - changes} rows written, "
+              f"high-water mark now {new_watermark}.")
+    except Exception as e:
+        conn.rollback()
+        print(f"Error in incremental load: {e}")
+    finally:
+        conn.close()
+
+def time_olap_queries(repeat=5):
+    """Best-of-repeat wall time in seconds for each OLAP query."""
+    conn = sqlite3.connect(DB_FILE)
+    timings = {}
+    try:
+        for name, query in load_olap_queries():
+            best = float('inf')
+            for _ in range(repeat):
+                start = time.perf_counter()
+                conn.execute(route_query(conn, query)).fetchall()
+                best = min(best, time.perf_counter() - start)
+            timings[name] = best
+    finally:
+        conn.close()
+    return timings
+
+def create_indexes(report_timings=False):
+    """Physical design stage: build the star-schema indexes after the load, then ANALYZE.
+
+    With report_timings the bundled OLAP queries are timed before and after.
+    """
+    print(f"\n--- PHYSICAL DESIGN PHASE ---")
+    before = None
+    if report_timings:
+        with metrics.stage('time_queries_before'):
+            before = time_olap_queries()
+    conn = sqlite3.connect(DB_FILE)
+    try:
+        with open(INDEX_FILE, 'r') as f:
+            index_sql = f.read()
+        if is_partitioned(conn):
+            # Every partition carries its own copy of the SalesFact indexes
+            for statement in fact_index_sql(INDEX_FILE):
+                index_sql = index_sql.replace(statement, '')
+        start = time.perf_counter()
+        with metrics.stage('build_indexes'):
+            conn.executescript(index_sql)
+        with metrics.stage('analyze'):
+            conn.execute("ANALYZE")
+        conn.commit()
+        print(f"Indexes built and analyzed in {time.perf_counter() - start:.2f}s.")
+    except Exception as e:
+        print(f"Error creating indexes: {e}")
+        return None
+    finally:
+        conn.close()
+    if not report_timings:
+        return None
+    with metrics.stage('time_queries_after'):
+        after = time_olap_queries()
+    print(f"{'Query':<45} {'Before (ms)':>12} {'After (ms)':>12} {'Speedup':>8}")
+    for name in before:
+        speedup = before[name] / after[name] if after[name] > 0 else float('inf')
+        print(f"{name[:45]:<45} {before[name] * 1000:>12.1f} {after[name] * 1000:>12.1f} {speedup:>7.1f}x")
+    return {'before': before, 'after': after}
+
+def partition_facts(grain):
+    """Split SalesFact into monthly or quarterly tables behind a SalesFact view (see fact_partitions.py)."""
+    print(f"\n--- PARTITIONING PHASE ---")
+    conn = sqlite3.connect(DB_FILE)
+    try:
+        start = time.perf_counter()
+        created = partition_sales_fact(conn, grain)
+        print(f"SalesFact split into {len(created)} {grain}ly partitions in {time.perf_counter() - start:.2f}s.")
+    except Exception as e:
+        print(f"Error partitioning SalesFact: {e}")
+    finally:
+        conn.close()
+
+def draw_sales_by_country(df_viz):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    plt.figure(figsize=(12, 6))
+    sns.barplot(data=df_viz, x='total_sales', y='country', hue='country', palette='viridis', legend=False)
+    plt.title('Top 10 Countries by Total Sales (2024-2025)')
+    plt.xlabel('Total Sales')
+    plt.ylabel('Country')
+    plt.tight_layout()
 
 def visualize_data():
     """Task 3.2: Visualize Results"""
     print(f"\n--- VISUALIZATION PHASE ---")
+    # Shared chart cache (DataMining/charts.py): redrawn only when the query result changes,
+    # and matplotlib/seaborn are only imported when it is
+    if CHARTS_DIR not in sys.path:
+        sys.path.append(CHARTS_DIR)
+    from charts import Chart, render
     conn = sqlite3.connect(DB_FILE)
     
-    # Query: Total Sales by Country (Top 10)
-    query = """
-    SELECT 
-        c.country,
-        SUM(f.total_sales) as total_sales
-    FROM SalesFact f
-    JOIN CustomerDim c ON f.customer_id = c.customer_id
-    GROUP BY c.country
-    ORDER BY total_sales DESC
-    LIMIT 10;
-    """
-    
     try:
-        df_viz = pd.read_sql_query(query, conn)
-        
-        plt.figure(figsize=(12, 6))
-        sns.barplot(data=df_viz, x='total_sales', y='country', hue='country', palette='viridis', legend=False)
-        plt.title('Top 10 Countries by Total Sales (2024-2025)')
-        plt.xlabel('Total Sales')
-        plt.ylabel('Country')
-        plt.tight_layout()
+        # Served from the country/quarter aggregate when it exists (same result as TOP_COUNTRIES_QUERY)
+        df_viz = rollup_sales(['country'], conn=conn)
+        df_viz = df_viz.sort_values('total_sales', ascending=False).head(10).reset_index(drop=True)
         
         output_path = os.path.join(BASE_DIR, '..', 'sales_by_country.png')
-        plt.savefig(output_path)
-        print(f"Visualization saved to: {output_path}")
+        status = render([Chart(output_path, draw_sales_by_country, df_viz=df_viz)])
+        if status[output_path] == 'cached':
+            print(f"Visualization unchanged: {output_path}")
+        else:
+            print(f"Visualization saved to: {output_path}")
         
     except Exception as e:
         print(f"Error visualizing data: {e}")
     finally:
         conn.close()
 
-if __name__ == "__main__":
-    # Initialize DB (Create tables)
-    init_db()
+def build_parser(prog=None):
+    """Command-line options of the ETL (also used by the etl/load-only pipeline commands)."""
+    parser = argparse.ArgumentParser(prog=prog, description="Retail ETL pipeline")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--stream', action='store_true', help="read the CSV in chunks with bounded memory")
+    mode.add_argument('--incremental', action='store_true',
+                      help="append sales newer than the last load instead of rebuilding the warehouse")
+    mode.add_argument('--staged', action='store_true',
+                      help="extract through the Parquet staging area, reused while the CSV is unchanged")
+    parser.add_argument('--bulk', action='store_true', help="use the executemany bulk loader for the full load")
+    parser.add_argument('--partition', choices=GRAINS,
+                        help="after a full load, split SalesFact into one table per month/quarter behind a view")
+    parser.add_argument('--index-timings', action='store_true',
+                        help="time the OLAP queries before and after the index build (two extra passes)")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="transform in this many worker processes (0 = one per CPU)")
+    parser.add_argument('--chunksize', type=int, default=CHUNK_SIZE, help="rows per chunk in --stream/--staged mode")
+    parser.add_argument('--metrics', metavar='REPORT_JSON',
+                        help="record wall/CPU time, peak memory and rows per stage into this JSON report")
+    parser.add_argument('--no-trace-memory', action='store_true',
+                        help="with --metrics, skip tracemalloc peaks (lower overhead)")
+    parser.add_argument('--profile-dir', help="with --metrics, write a cProfile dump per stage here")
+    parser.add_argument('--no-compact', action='store_true',
+                        help="extract with pandas' default dtypes instead of the compact ingest schema")
+    parser.add_argument('--memory-report', action='store_true',
+                        help="print the memory of the default vs compact extract layouts and exit")
+    return parser
+
+def main(argv=None, visualize=True, prog=None):
+    """Run the pipeline for command-line arguments argv (sys.argv by default).
+
+    visualize=False is the load-only run: no chart, so matplotlib and seaborn are never
+    imported. The OLAP query timings around the index build only run with --index-timings.
+    """
+    args = build_parser(prog).parse_args(argv)
     
-    # ETL Pipeline
-    df_raw = extract_data(DATA_FILE)
+    if args.memory_report:
+        memory_report(DATA_FILE)
+        return
     
-    if df_raw is not None:
-        data_staging = transform_data(df_raw)
-        load_data(data_staging)
+    if args.metrics:
+        metrics.enable(trace_memory=not args.no_trace_memory, profile_dir=args.profile_dir)
+
+    # ETL Pipeline
+    if args.incremental:
+        # Indexes from the last full load stay in place and are maintained by SQLite
+        with metrics.stage('incremental_load'):
+            incremental_load(DATA_FILE, args.chunksize)
+    else:
+        # Initialize DB (Create tables)
+        with metrics.stage('init_db'):
+            init_db()
+        
+        if args.stream:
+            with metrics.stage('stream_etl'):
+                stream_etl(DATA_FILE, args.chunksize)
+        else:
+            with metrics.stage('extract_data') as m:
+                if args.staged:
+                    try:
+                        from staging import stage_extract, read_staged_window
+                        df_raw = read_staged_window(stage_extract(DATA_FILE, args.chunksize))
+                    except ImportError:
+                        print("Error: pyarrow library not found. Please pip install pyarrow.")
+                        df_raw = None
+                else:
+                    df_raw = extract_data(DATA_FILE, compact=not args.no_compact)
+                m['rows_out'] = None if df_raw is None else len(df_raw)
+            if df_raw is None:
+                return 1
+            with metrics.stage('transform_data', rows_in=len(df_raw)) as m:
+                if args.workers == 1:
+                    data_staging = transform_data(df_raw)
+                else:
+                    data_staging = transform_data_parallel(df_raw, args.workers or None)
+                m['rows_out'] = len(data_staging['SalesFact'])
+            with metrics.stage('load_data', rows_in=len(data_staging['SalesFact'])):
+                if args.bulk:
+                    bulk_load_data(data_staging)
+                else:
+                    load_data(data_staging)
         
-        # Run Visualization
-        visualize_data()
+        # Physical design after the load (see warehouse_indexes.sql)
+        with metrics.stage('create_indexes'):
+            create_indexes(report_timings=args.index_timings)
         
-        print("\nETL Process Completed Successfully.")
+        if args.partition:
+            with metrics.stage('partition_facts'):
+                partition_facts(args.partition)
+    
+    # Run Visualization
+    if visualize:
+        with metrics.stage('visualize_data'):
+            visualize_data()
+    
+    print("\nETL Process Completed Successfully.")
+    if args.metrics:
+        metrics.write_report(args.metrics)
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,476 @@
+import argparse
+import os
+import re
+import sqlite3
+import time
+from itertools import islice
+
+# Define paths (sqlite3 only: olap_sql.py routes its queries through this module)
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DB_FILE = os.path.join(BASE_DIR, '..', 'DataWarehousing', 'retail_dw.db')
+INDEX_FILE = os.path.join(BASE_DIR, '..', 'DataWarehousing', 'warehouse_indexes.sql')
+ARCHIVE_DIR = os.path.join(BASE_DIR, '..', 'DataWarehousing', 'archive')
+
+GRAINS = ('month', 'quarter')
+FACT_COLUMNS = ['sale_id', 'customer_id', 'product_id', 'time_id', 'invoice_no', 'quantity', 'unit_price', 'total_sales']
+# Rows per executemany call in insert_facts
+BATCH_SIZE = 50_000
+
+# One row per partition ever created; dropped and archived partitions stay listed
+CATALOG_SQL = """
+CREATE TABLE IF NOT EXISTS FactPartition (
+    name TEXT PRIMARY KEY, -- table holding the rows, e.g. SalesFact_2024_08
+    period TEXT NOT NULL UNIQUE, -- '2024-08' (month) or '2024-Q3' (quarter)
+    grain TEXT NOT NULL, -- 'month' or 'quarter', the same for every partition
+    min_time_id INTEGER NOT NULL, -- time_id range (YYYYMMDD) the table accepts
+    max_time_id INTEGER NOT NULL,
+    row_count INTEGER NOT NULL DEFAULT 0,
+    max_sale_id INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL DEFAULT 'active', -- 'active', 'dropped' or 'archived'
+    archive_file TEXT
+)
+"""
+
+# Same columns as SalesFact in warehouse_schema.sql; sale_ids come from one sequence across
+# all partitions (see next_sale_id), and the CHECK keeps every row in its period
+PARTITION_SQL = """
+CREATE TABLE {table} (
+    sale_id INTEGER PRIMARY KEY,
+    customer_id INTEGER,
+    product_id INTEGER,
+    time_id INTEGER CHECK (time_id BETWEEN {min_time_id} AND {max_time_id}),
+    invoice_no TEXT,
+    quantity INTEGER,
+    unit_price REAL,
+    total_sales REAL,
+    FOREIGN KEY (customer_id) REFERENCES CustomerDim(customer_id),
+    FOREIGN KEY (product_id) REFERENCES ProductDim(product_id),
+    FOREIGN KEY (time_id) REFERENCES TimeDim(time_id)
+)
+"""
+
+def period_of(time_id, grain):
+    """Partition period of a YYYYMMDD time_id: '2024-08' by month, '2024-Q3' by quarter."""
+    year, month = time_id // 10000, time_id // 100 % 100
+    if grain == 'month':
+        return f"{year}-{month:02d}"
+    return f"{year}-Q{(month - 1) // 3 + 1}"
+
+def period_bounds(period):
+    """First and last time_id a period can hold."""
+    year, part = period.split('-')
+    if part.startswith('Q'):
+        first = 3 * int(part[1:]) - 2
+        last = first + 2
+    else:
+        first = last = int(part)
+    return int(year) * 10000 + first * 100 + 1, int(year) * 10000 + last * 100 + 31
+
+def partition_name(period):
+    return 'SalesFact_' + period.replace('-', '_')
+
+def time_key(value):
+    """time_id (YYYYMMDD) of a date, datetime, Timestamp, 'YYYY-MM-DD...' string or time_id."""
+    if isinstance(value, int):
+        return value
+    return int(str(value)[:10].replace('-', ''))
+
+def time_range(year=None, quarter=None, month=None):
+    """(first, last) time_id of a year, quarter or month, or (None, None) without a year."""
+    if year is None:
+        return None, None
+    if month is not None:
+        return period_bounds(f"{year}-{int(month):02d}")
+    if quarter is not None:
+        return period_bounds(f"{year}-Q{quarter}")
+    return int(year) * 10000 + 101, int(year) * 10000 + 1231
+
+def is_partitioned(conn):
+    """True once partition_sales_fact() has replaced the SalesFact table with a view."""
+    row = conn.execute("SELECT type FROM sqlite_master WHERE name = 'SalesFact'").fetchone()
+    return row is not None and row[0] == 'view'
+
+def partition_grain(conn):
+    """The grain ('month' or 'quarter') SalesFact was partitioned at."""
+    return conn.execute("SELECT grain FROM FactPartition LIMIT 1").fetchone()[0]
+
+def partitions(conn, start=None, end=None, status='active'):
+    """Catalog rows (name, period, min_time_id, max_time_id, row_count, status) in time order.
+
+    start/end (dates or time_ids, both inclusive) keep only the partitions whose range
+    overlaps them; status=None lists every partition ever created.
+    """
+    query = ("SELECT name, period, min_time_id, max_time_id, row_count, status FROM FactPartition "
+             "WHERE (? IS NULL OR status = ?) AND (? IS NULL OR max_time_id >= ?) AND (? IS NULL OR min_time_id <= ?) "
+             "ORDER BY min_time_id")
+    start = None if start is None else time_key(start)
+    end = None if end is None else time_key(end)
+    return conn.execute(query, (status, status, start, start, end, end)).fetchall()
+
+def fact_index_sql(index_file=INDEX_FILE):
+    """The CREATE INDEX statements on SalesFact in warehouse_indexes.sql."""
+    with open(index_file, 'r') as f:
+        lines = f.read().splitlines()
+    statements, statement = [], ''
+    for line in lines:
+        stripped = line.strip()
+        if not statement and (not stripped or stripped.startswith('--')):
+            continue
+        statement += line + '\n'
+        if sqlite3.complete_statement(statement):
+            if re.search(r'\bON\s+SalesFact\s*\(', statement):
+                statements.append(statement.strip())
+            statement = ''
+    return statements
+
+def _index_partition(conn, table):
+    """Give a partition its own copy of every SalesFact index, e.g. idx_salesfact_2024_08_time."""
+    for statement in fact_index_sql():
+        statement = statement.replace('idx_salesfact_', f"idx_{table.lower()}_")
+        conn.execute(re.sub(r'\bON\s+SalesFact\s*\(', f"ON {table} (", statement))
+
+def _create_partition(conn, period, grain):
+    """Create the (empty, unindexed) table for a period and list it in the catalog."""
+    table = partition_name(period)
+    min_time_id, max_time_id = period_bounds(period)
+    conn.execute(PARTITION_SQL.format(table=table, min_time_id=min_time_id, max_time_id=max_time_id))
+    conn.execute("INSERT INTO FactPartition (name, period, grain, min_time_id, max_time_id) VALUES (?, ?, ?, ?, ?)",
+                 (table, period, grain, min_time_id, max_time_id))
+    return table
+
+def rebuild_view(conn):
+    """(Re)create the SalesFact view as the UNION ALL of the active partitions."""
+    columns = ', '.join(FACT_COLUMNS)
+    tables = [row[0] for row in partitions(conn)]
+    if tables:
+        body = '\nUNION ALL\n'.join(f"SELECT {columns} FROM {table}" for table in tables)
+    else:
+        body = f"SELECT {', '.join(f'NULL AS {col}' for col in FACT_COLUMNS)} WHERE 0"
+    conn.execute("DROP VIEW IF EXISTS SalesFact")
+    conn.execute(f"CREATE VIEW SalesFact AS\n{body}")
+
+def partition_sales_fact(conn, grain='month'):
+    """Split the SalesFact table into one table per month (or quarter) behind a SalesFact view.
+
+    Each partition gets the SalesFact columns, a CHECK on its time_id range and its own
+    copy of the SalesFact indexes; the catalog is kept in FactPartition. Readers keep
+    querying SalesFact unchanged. Runs in one transaction and commits. Returns the names
+    of the partitions created.
+    """
+    if grain not in GRAINS:
+        raise ValueError(f"grain must be one of {GRAINS}, not {grain!r}")
+    if is_partitioned(conn):
+        raise ValueError("SalesFact is already partitioned")
+    if not conn.in_transaction:
+        conn.execute("BEGIN")
+    try:
+        conn.execute(CATALOG_SQL)
+        months = [row[0] for row in conn.execute(
+            "SELECT DISTINCT time_id / 100 FROM SalesFact WHERE time_id IS NOT NULL ORDER BY 1")]
+        periods = sorted({period_of(month * 100 + 1, grain) for month in months})
+        columns = ', '.join(FACT_COLUMNS)
+        created = []
+        for period in periods:
+            table = _create_partition(conn, period, grain)
+            min_time_id, max_time_id = period_bounds(period)
+            # Rows in sale_id order, so each partition's rowid B-tree is written sequentially
+            conn.execute(f"""
+                INSERT INTO {table} ({columns})
+                SELECT {columns} FROM SalesFact WHERE time_id BETWEEN ? AND ? ORDER BY sale_id
+            """, (min_time_id, max_time_id))
+            _index_partition(conn, table)
+            conn.execute("""
+                UPDATE FactPartition SET row_count = (SELECT COUNT(*) FROM {0}),
+                    max_sale_id = IFNULL((SELECT MAX(sale_id) FROM {0}), 0)
+                WHERE name = ?
+            """.format(table), (table,))
+            created.append(table)
+        leftover = conn.execute("SELECT COUNT(*) FROM SalesFact WHERE time_id IS NULL").fetchone()[0]
+        if leftover:
+            raise ValueError(f"{leftover} SalesFact rows have no time_id and fit no partition")
+        conn.execute("DROP TABLE SalesFact")
+        rebuild_view(conn)
+        for table in created:
+            conn.execute(f"ANALYZE {table}")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return created
+
+def next_sale_id(conn):
+    """First unused sale_id across all partitions, including dropped and archived ones."""
+    return conn.execute("SELECT IFNULL(MAX(max_sale_id), 0) + 1 FROM FactPartition").fetchone()[0]
+
+def insert_facts(conn, columns, rows, batch_size=BATCH_SIZE):
+    """INSERT fact rows (tuples with the given columns, without sale_id) into their partitions.
+
+    sale_ids continue the sequence in row order, as the AUTOINCREMENT of the SalesFact
+    table would assign them. Partitions for new periods (at the grain recorded in
+    FactPartition) are created and the view is rebuilt. Rows for a dropped or archived period raise
+    ValueError. Does not commit, so it can share the caller's load transaction. Returns
+    the number of rows inserted.
+    """
+    columns = list(columns)
+    time_pos = columns.index('time_id')
+    catalog = {period: (name, status) for name, period, _, _, _, status in partitions(conn, status=None)}
+    grain = partition_grain(conn)
+    sql_columns = ', '.join(['sale_id'] + columns)
+    placeholders = ', '.join('?' * (len(columns) + 1))
+    if not conn.in_transaction:
+        conn.execute("BEGIN")
+
+    sale_id = next_sale_id(conn)
+    inserted, created = 0, False
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            break
+        buckets = {}
+        for row in batch:
+            buckets.setdefault(period_of(row[time_pos], grain), []).append((sale_id,) + tuple(row))
+            sale_id += 1
+        for period, bucket in buckets.items():
+            name, status = catalog.get(period, (None, None))
+            if name is None:
+                name = _create_partition(conn, period, grain)
+                _index_partition(conn, name)
+                catalog[period] = (name, 'active')
+                created = True
+            elif status != 'active':
+                raise ValueError(f"Partition {name} for {period} is {status}; cannot load rows into it")
+            conn.executemany(f"INSERT INTO {name} ({sql_columns}) VALUES ({placeholders})", bucket)
+            conn.execute("UPDATE FactPartition SET row_count = row_count + ?, max_sale_id = MAX(max_sale_id, ?) "
+                         "WHERE name = ?", (len(bucket), bucket[-1][0], name))
+            inserted += len(bucket)
+    if created:
+        rebuild_view(conn)
+    return inserted
+
+def fact_source(conn, start=None, end=None):
+    """FROM-clause source with only the SalesFact rows of partitions overlapping start..end.
+
+    'SalesFact' when the table is not partitioned or every partition overlaps, the partition
+    table itself when only one does, otherwise a UNION ALL subquery of the overlapping ones.
+    """
+    if (start is None and end is None) or not is_partitioned(conn):
+        return 'SalesFact'
+    tables = [row[0] for row in partitions(conn, start, end)]
+    if len(tables) == len(partitions(conn)):
+        return 'SalesFact'
+    if len(tables) == 1:
+        return tables[0]
+    if not tables:
+        return "(SELECT * FROM SalesFact WHERE 0)"
+    columns = ', '.join(FACT_COLUMNS)
+    return "(" + " UNION ALL ".join(f"SELECT {columns} FROM {table}" for table in tables) + ")"
+
+def date_range_from_sql(sql, params=None):
+    """(start, end) time_ids implied by the WHERE clause of a single SELECT, or (None, None).
+
+    Recognizes ANDed equality on year/quarter/month (literals or :named params) and
+    comparisons/BETWEEN on time_id. Anything it cannot be sure about (OR, NOT, CASE,
+    subqueries) gives (None, None), i.e. every partition is read.
+    """
+    params = params if isinstance(params, dict) else {}
+    where = re.search(r'\bWHERE\b(.*?)(?:\bGROUP\s+BY\b|\bORDER\s+BY\b|\bHAVING\b|\bLIMIT\b|;|$)', sql, re.I | re.S)
+    if (where is None or len(re.findall(r'\bSELECT\b', sql, re.I)) > 1
+            or re.search(r'\b(OR|NOT|CASE)\b', where.group(1), re.I)):
+        return None, None
+    clause = where.group(1)
+
+    def value(token):
+        """The integer a literal or :named param stands for, or None if it has none.
+
+        Only ints and digit strings count: SQLite compares the integer columns numerically
+        with those, but e.g. '2025-01-01' as text, where pruning would change the result.
+        """
+        if not token.startswith(':'):
+            return int(token)
+        raw = params.get(token[1:])
+        if isinstance(raw, str) and raw.isdigit():
+            return int(raw)
+        if isinstance(raw, int) and not isinstance(raw, bool):
+            return raw
+        return None
+
+    parts = {}
+    for column in ('year', 'quarter', 'month'):
+        found = {value(v) for v in re.findall(rf'(?<![\w.])(?:\w+\.)?{column}\s*=\s*(\d+|:\w+)', clause, re.I)}
+        if len(found) > 1 or None in found:
+            return None, None
+        parts[column] = found.pop() if found else None
+    start, end = time_range(**parts)
+
+    bounds = re.findall(r'(?<![\w.])(?:\w+\.)?time_id\s*(>=|>|<=|<|=|BETWEEN)\s*(\d+|:\w+)(?:\s+AND\s+(\d+|:\w+))?',
+                        clause, re.I)
+    for op, first, second in bounds:
+        first = value(first)
+        if first is None:
+            return None, None
+        op = op.upper()
+        low = {'>=': first, '>': first + 1, '=': first, 'BETWEEN': first}.get(op)
+        high = {'<=': first, '<': first - 1, '=': first}.get(op)
+        if op == 'BETWEEN':
+            high = value(second) if second else None
+            if high is None:
+                return None, None
+        if low is not None:
+            start = low if start is None else max(start, low)
+        if high is not None:
+            end = high if end is None else min(end, high)
+    return start, end
+
+def route_query(conn, sql, params=None, start=None, end=None):
+    """sql with SalesFact replaced by only the partitions its date predicate can touch.
+
+    The range is start..end when given, otherwise date_range_from_sql(). Queries that
+    reference SalesFact columns by table name, or whose range cannot be determined, are
+    returned unchanged.
+    """
+    if not is_partitioned(conn) or re.search(r'\bSalesFact\s*\.', sql):
+        return sql
+    if start is None and end is None:
+        start, end = date_range_from_sql(sql, params)
+    source = fact_source(conn, start, end)
+    if source == 'SalesFact':
+        return sql
+    return re.sub(r'\bSalesFact\b', lambda _: source, sql)
+
+def _subtract_aggregates(conn, table):
+    """Take the rows of a partition out of the aggregate tables (see olap_aggregates.py)."""
+    from olap_aggregates import AGGREGATES, FACT_COLUMNS as AGG_COLUMNS
+    existing = {name for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    if 'LoadState' not in existing:
+        return
+    row = conn.execute("SELECT aggregated_sale_id FROM LoadState WHERE id = 1").fetchone()
+    aggregated = (row[0] or 0) if row else 0
+    for agg_table, columns in AGGREGATES:
+        if agg_table not in existing:
+            continue
+        source = ["IFNULL(c.country, '')" if col == 'country' else AGG_COLUMNS[col] for col in columns]
+        conn.execute(f"""
+            UPDATE {agg_table} SET
+                total_sales = {agg_table}.total_sales - d.total_sales,
+                total_quantity = {agg_table}.total_quantity - d.total_quantity,
+                sale_count = {agg_table}.sale_count - d.sale_count
+            FROM (
+                SELECT {', '.join(f'{s} AS {col}' for s, col in zip(source, columns))},
+                       SUM(f.total_sales) AS total_sales, SUM(f.quantity) AS total_quantity, COUNT(*) AS sale_count
+                FROM {table} f
+                JOIN CustomerDim c ON f.customer_id = c.customer_id
+                JOIN TimeDim t ON f.time_id = t.time_id
+                WHERE f.sale_id <= ?
+                GROUP BY {', '.join(source)}
+            ) d
+            WHERE {' AND '.join(f'{agg_table}.{col} = d.{col}' for col in columns)}
+        """, (aggregated,))
+        conn.execute(f"DELETE FROM {agg_table} WHERE sale_count <= 0")
+
+def drop_partition(conn, table, keep_aggregates=False, status='dropped'):
+    """Remove a whole partition with DROP TABLE: no row-by-row DELETE and no index maintenance.
+
+    Its rows are first subtracted from the aggregate tables, unless keep_aggregates, which
+    keeps the retired period in the roll-ups (rollup_sales then still reports it). Commits.
+    """
+    row = conn.execute("SELECT status FROM FactPartition WHERE name = ?", (table,)).fetchone()
+    if row is None or row[0] != 'active':
+        raise ValueError(f"No active partition named {table}")
+    if not conn.in_transaction:
+        conn.execute("BEGIN")
+    try:
+        if not keep_aggregates:
+            _subtract_aggregates(conn, table)
+        conn.execute("UPDATE FactPartition SET status = ? WHERE name = ?", (status, table))
+        rebuild_view(conn)
+        conn.execute(f"DROP TABLE {table}")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+def archive_partition(conn, table, archive_dir=ARCHIVE_DIR, keep_aggregates=False):
+    """Copy a partition into its own database file (table SalesFact there), then drop it.
+
+    Only that partition's rows are read. Commits; returns the archive file path.
+    """
+    row = conn.execute("SELECT period, status FROM FactPartition WHERE name = ?", (table,)).fetchone()
+    if row is None or row[1] != 'active':
+        raise ValueError(f"No active partition named {table}")
+    min_time_id, max_time_id = period_bounds(row[0])
+    os.makedirs(archive_dir, exist_ok=True)
+    archive_file = os.path.normpath(os.path.join(archive_dir, f"{table}.db"))
+    if os.path.exists(archive_file):
+        os.remove(archive_file)
+    # ATTACH/DETACH cannot run inside a transaction
+    conn.commit()
+    conn.execute("ATTACH DATABASE ? AS archive", (archive_file,))
+    try:
+        conn.execute(PARTITION_SQL.format(table='archive.SalesFact', min_time_id=min_time_id, max_time_id=max_time_id))
+        columns = ', '.join(FACT_COLUMNS)
+        conn.execute(f"INSERT INTO archive.SalesFact ({columns}) SELECT {columns} FROM main.{table}")
+        conn.commit()
+    finally:
+        conn.execute("DETACH DATABASE archive")
+    conn.execute("UPDATE FactPartition SET archive_file = ? WHERE name = ?", (archive_file, table))
+    drop_partition(conn, table, keep_aggregates, status='archived')
+    return archive_file
+
+def retire_partitions(conn, before, archive=True, archive_dir=ARCHIVE_DIR, keep_aggregates=False):
+    """Archive (or just drop) every active partition that ends before the given date."""
+    cutoff = time_key(before)
+    retired = []
+    for name, _, _, max_time_id, _, _ in partitions(conn):
+        if max_time_id >= cutoff:
+            break
+        if archive:
+            archive_partition(conn, name, archive_dir, keep_aggregates)
+        else:
+            drop_partition(conn, name, keep_aggregates)
+        retired.append(name)
+    return retired
+
+def print_partitions(conn):
+    if not is_partitioned(conn):
+        print("SalesFact is not partitioned.")
+        return
+    print(f"{'Partition':<20} {'Period':<8} {'Rows':>9}  Status")
+    for name, period, _, _, row_count, status in partitions(conn, status=None):
+        print(f"{name:<20} {period:<8} {row_count:>9}  {status}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Date-partitioned SalesFact: split, list, drop and archive partitions")
+    parser.add_argument('--db', default=DB_FILE)
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('list', help="show the partitions and their row counts")
+    split = commands.add_parser('partition', help="split the SalesFact table behind a view")
+    split.add_argument('--grain', choices=GRAINS, default='month')
+    for name, help_text in [('drop', "DROP a partition"), ('archive', "move a partition to its own .db file")]:
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument('name', help="partition table, e.g. SalesFact_2024_08")
+        command.add_argument('--keep-aggregates', action='store_true', help="leave its rows in the aggregate tables")
+    retire = commands.add_parser('retire', help="archive (or drop) every partition ending before a date")
+    retire.add_argument('--before', required=True, help="e.g. 2024-07-01")
+    retire.add_argument('--drop', action='store_true', help="drop without archiving")
+    retire.add_argument('--keep-aggregates', action='store_true')
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    try:
+        start = time.perf_counter()
+        if args.command == 'partition':
+            created = partition_sales_fact(conn, args.grain)
+            print(f"SalesFact split into {len(created)} partitions in {time.perf_counter() - start:.2f}s.")
+        elif args.command == 'drop':
+            drop_partition(conn, args.name, args.keep_aggregates)
+            print(f"Dropped {args.name} in {time.perf_counter() - start:.3f}s.")
+        elif args.command == 'archive':
+            path = archive_partition(conn, args.name, keep_aggregates=args.keep_aggregates)
+            print(f"Archived {args.name} to {path} in {time.perf_counter() - start:.2f}s.")
+        elif args.command == 'retire':
+            retired = retire_partitions(conn, args.before, archive=not args.drop, keep_aggregates=args.keep_aggregates)
+            print(f"Retired {len(retired)} partitions in {time.perf_counter() - start:.2f}s: {', '.join(retired) or '-'}")
+        print_partitions(conn)
+    finally:
+        conn.close()
@@ -0,0 +1,135 @@
+import pandas as pd
+import os
+import sqlite3
+
+from fact_partitions import fact_source, time_range
+
+# Define paths
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DB_FILE = os.path.join(BASE_DIR, '..', 'DataWarehousing', 'retail_dw.db')
+
+MEASURES = ['total_sales', 'total_quantity', 'sale_count']
+
+# Aggregate tables from coarsest to finest; the first one holding every requested column answers the query.
+AGGREGATES = [
+    ('AggSalesCountryQuarter', ['country', 'year', 'quarter']),
+    ('AggSalesCountryMonth', ['country', 'year', 'quarter', 'month']),
+    ('AggSalesProductMonth', ['product_id', 'year', 'quarter', 'month']),
+]
+
+# Column expressions for the fact-table fallback
+FACT_COLUMNS = {
+    'country': 'c.country',
+    'year': 't.year',
+    'quarter': 't.quarter',
+    'month': 't.month',
+    'day': 't.day',
+    'product_id': 'f.product_id',
+    'stock_code': 'p.stock_code',
+    'description': 'p.description',
+}
+
+def refresh_aggregates(conn, rebuild=False):
+    """Fold SalesFact rows added since the last refresh into the aggregate tables.
+
+    The position is kept in LoadState.aggregated_sale_id. rebuild=True recomputes the
+    tables from scratch (needed when dimension attributes of loaded facts change).
+    Does not commit, so it can share the caller's load transaction. Returns the number
+    of fact rows folded in.
+    """
+    if rebuild:
+        for table, _ in AGGREGATES:
+            conn.execute(f"DELETE FROM {table}")
+        conn.execute("UPDATE LoadState SET aggregated_sale_id = 0")
+    row = conn.execute("SELECT aggregated_sale_id FROM LoadState WHERE id = 1").fetchone()
+    last_sale_id = (row[0] or 0) if row else 0
+    max_sale_id, new_rows = conn.execute(
+        "SELECT MAX(sale_id), COUNT(*) FROM SalesFact WHERE sale_id > ?", (last_sale_id,)).fetchone()
+    if not new_rows:
+        return 0
+
+    for table, columns in AGGREGATES:
+        source = ["IFNULL(c.country, '')" if col == 'country' else FACT_COLUMNS[col] for col in columns]
+        conn.execute(f"""
+            INSERT INTO {table} ({', '.join(columns)}, total_sales, total_quantity, sale_count)
+            SELECT {', '.join(source)}, SUM(f.total_sales), SUM(f.quantity), COUNT(*)
+            FROM SalesFact f
+            JOIN CustomerDim c ON f.customer_id = c.customer_id
+            JOIN TimeDim t ON f.time_id = t.time_id
+            WHERE f.sale_id > ? AND f.sale_id <= ?
+            GROUP BY {', '.join(source)}
+            ON CONFLICT ({', '.join(columns)}) DO UPDATE SET
+                total_sales = total_sales + excluded.total_sales,
+                total_quantity = total_quantity + excluded.total_quantity,
+                sale_count = sale_count + excluded.sale_count
+        """, (last_sale_id, max_sale_id))
+    conn.execute("UPDATE LoadState SET aggregated_sale_id = ? WHERE id = 1", (max_sale_id,))
+    return new_rows
+
+def choose_source(columns, conn):
+    """Name of the coarsest aggregate table covering columns, or None if only SalesFact can answer."""
+    existing = {name for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    for table, grain in AGGREGATES:
+        if table in existing and set(columns) <= set(grain):
+            return table
+    return None
+
+def rollup_sales(group_by, filters=None, conn=None):
+    """Total sales, quantity and row count grouped by group_by, e.g. ['country', 'year', 'quarter'].
+
+    filters maps column -> value (equality). Served from the coarsest aggregate table that
+    has all the columns, falling back to SalesFact joined with its dimensions (only the
+    partitions of the filtered year/quarter/month when it is partitioned). The table
+    used is in df.attrs['source'].
+    """
+    group_by = list(group_by)
+    filters = filters or {}
+    unknown = (set(group_by) | set(filters)) - set(FACT_COLUMNS)
+    if unknown:
+        raise ValueError(f"Unknown roll-up columns: {sorted(unknown)}")
+
+    own_conn = conn is None
+    if own_conn:
+        conn = sqlite3.connect(DB_FILE)
+    try:
+        source = choose_source(group_by + list(filters), conn)
+        if source is not None:
+            # '' stands for a missing country in the aggregate tables
+            select = ["NULLIF(country, '') AS country" if col == 'country' else col for col in group_by]
+            where = ["country = IFNULL(?, '')" if col == 'country' else f"{col} = ?" for col in filters]
+            measures = [f"SUM({m}) AS {m}" for m in MEASURES]
+            from_clause = source
+        else:
+            select = [f"{FACT_COLUMNS[col]} AS {col}" for col in group_by]
+            where = [f"{FACT_COLUMNS[col]} IS ?" for col in filters]
+            measures = ["SUM(f.total_sales) AS total_sales", "SUM(f.quantity) AS total_quantity",
+                        "COUNT(*) AS sale_count"]
+            facts = fact_source(conn, *time_range(filters.get('year'), filters.get('quarter'), filters.get('month')))
+            from_clause = f"""{facts} f
+            JOIN CustomerDim c ON f.customer_id = c.customer_id
+            JOIN TimeDim t ON f.time_id = t.time_id"""
+            if {'stock_code', 'description'} & (set(group_by) | set(filters)):
+                from_clause += "\n            JOIN ProductDim p ON f.product_id = p.product_id"
+        query = f"SELECT {', '.join(select + measures)} FROM {from_clause}"
+        if where:
+            query += " WHERE " + " AND ".join(where)
+        if group_by:
+            positions = ', '.join(str(i + 1) for i in range(len(group_by)))
+            query += f" GROUP BY {positions} ORDER BY {positions}"
+        df = pd.read_sql_query(query, conn, params=list(filters.values()))
+        df.attrs['source'] = source or 'SalesFact'
+        return df
+    finally:
+        if own_conn:
+            conn.close()
+
+if __name__ == "__main__":
+    conn = sqlite3.connect(DB_FILE)
+    try:
+        print(f"Refreshed aggregates with {refresh_aggregates(conn)} new fact rows.")
+        conn.commit()
+        df = rollup_sales(['country', 'year', 'quarter'], conn=conn)
+        print(f"3.1.1 Roll-Up served from {df.attrs['source']}:")
+        print(df.head(10))
+    finally:
+        conn.close()
@@ -0,0 +1,317 @@
+import pandas as pd
+import argparse
+import numpy as np
+import os
+import re
+import sqlite3
+import time
+from itertools import combinations
+
+# Define paths
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DB_FILE = os.path.join(BASE_DIR, '..', 'DataWarehousing', 'retail_dw.db')
+
+# Rows fetched per read while loading the fact table
+LOAD_CHUNK_SIZE = 1_000_000
+
+# Group by a dense bincount while the number of possible cells stays below this; sparser
+# combinations are compacted with np.unique instead
+MAX_DENSE_CELLS = 1 << 24
+
+# Cube dimensions: attribute -> (dimension table, key column)
+DIMENSIONS = {
+    'country': ('CustomerDim', 'customer_id'),
+    'year': ('TimeDim', 'time_id'),
+    'quarter': ('TimeDim', 'time_id'),
+    'month': ('TimeDim', 'time_id'),
+    'day': ('TimeDim', 'time_id'),
+    'product_id': ('ProductDim', 'product_id'),
+    'stock_code': ('ProductDim', 'product_id'),
+    'description': ('ProductDim', 'product_id'),
+}
+MEASURES = ['total_sales', 'total_quantity', 'sale_count']
+
+def encode(values):
+    """Integer codes and sorted labels for values; NULL gets code 0 (sorting first, as in SQLite)."""
+    codes, uniques = pd.factorize(pd.Series(values), sort=True)
+    labels = np.asarray(uniques)
+    if labels.dtype.kind not in 'iuf':
+        labels = labels.astype(object)
+    if (codes < 0).any():
+        codes = codes + 1
+        labels = np.concatenate([np.array([None], dtype=object), labels.astype(object)])
+    return codes.astype(np.min_scalar_type(max(len(labels) - 1, 0))), labels
+
+def like_mask(values, pattern):
+    """Boolean mask of values matching a SQL LIKE pattern (SQLite semantics: % and _ wildcards,
+    case-insensitive for ASCII only, NULL never matches)."""
+    regex = ''.join('.*' if ch == '%' else '.' if ch == '_' else re.escape(ch) for ch in pattern)
+    matcher = re.compile(regex, re.IGNORECASE | re.ASCII | re.DOTALL)
+    return np.array([v is not None and matcher.fullmatch(v) is not None for v in values], dtype=bool)
+
+class SalesCube:
+    """SalesFact held in memory as NumPy columns for fast OLAP operations.
+
+    Each fact stores the row positions of its customer, date and product in the dimension
+    tables; dimension attributes are integer-coded per dimension row, so grouping is a gather
+    plus np.bincount. slice()/dice()/where_like() return sub-cubes, aggregate() answers a
+    single GROUP BY, and grouping_sets()/rollup()/cube() compute many levels from one pass
+    over the facts, like SQL's GROUPING SETS/ROLLUP/CUBE.
+    """
+
+    def __init__(self, keys, quantity, total_sales, attributes):
+        self.keys = keys                # dimension table -> fact row positions in it
+        self.quantity = quantity
+        self.total_sales = total_sales
+        self.attributes = attributes    # attribute -> (dimension table, codes per dimension row, labels)
+
+    def __len__(self):
+        return len(self.total_sales)
+
+    @classmethod
+    def from_db(cls, db_file=DB_FILE, chunksize=LOAD_CHUNK_SIZE):
+        """Load the fact table and dimension attributes of a warehouse."""
+        conn = sqlite3.connect(db_file)
+        try:
+            return cls.from_connection(conn, chunksize)
+        finally:
+            conn.close()
+
+    @classmethod
+    def from_connection(cls, conn, chunksize=LOAD_CHUNK_SIZE):
+        dims = {
+            'CustomerDim': pd.read_sql_query("SELECT customer_id, country FROM CustomerDim ORDER BY customer_id", conn),
+            'TimeDim': pd.read_sql_query("SELECT time_id, year, quarter, month, day FROM TimeDim ORDER BY time_id", conn),
+            'ProductDim': pd.read_sql_query(
+                "SELECT product_id, stock_code, description FROM ProductDim ORDER BY product_id", conn),
+        }
+        attributes = {}
+        for attr, (table, key) in DIMENSIONS.items():
+            codes, labels = encode(dims[table][key] if attr == key else dims[table][attr])
+            attributes[attr] = (table, codes, labels)
+
+        parts = {name: [] for name in ['customer_id', 'time_id', 'product_id', 'quantity', 'total_sales']}
+        for chunk in pd.read_sql_query(
+                "SELECT customer_id, time_id, product_id, quantity, total_sales FROM SalesFact ORDER BY sale_id",
+                conn, chunksize=chunksize):
+            # Replace each foreign key by the row position in its dimension, dropping facts
+            # without a match (an inner join, as in the SQL queries)
+            valid = np.ones(len(chunk), dtype=bool)
+            positions = {}
+            for table, key in [('CustomerDim', 'customer_id'), ('TimeDim', 'time_id'), ('ProductDim', 'product_id')]:
+                ids = dims[table][key].to_numpy()
+                values = chunk[key].to_numpy(dtype=np.int64, na_value=-1)
+                pos = np.minimum(np.searchsorted(ids, values), max(len(ids) - 1, 0))
+                valid &= (ids[pos] == values) if len(ids) else False
+                positions[key] = pos.astype(np.min_scalar_type(max(len(ids) - 1, 0)))
+            for key in positions:
+                parts[key].append(positions[key][valid])
+            parts['quantity'].append(chunk['quantity'].to_numpy(dtype=np.int64)[valid])
+            parts['total_sales'].append(chunk['total_sales'].to_numpy(dtype=np.float64)[valid])
+
+        def column(name, dtype):
+            return np.concatenate(parts[name]) if parts[name] else np.empty(0, dtype=dtype)
+
+        keys = {table: column(key, np.uint8) for table, key in
+                [('CustomerDim', 'customer_id'), ('TimeDim', 'time_id'), ('ProductDim', 'product_id')]}
+        return cls(keys, column('quantity', np.int64), column('total_sales', np.float64), attributes)
+
+    def codes(self, attr):
+        """Per-fact codes and labels of an attribute."""
+        if attr not in self.attributes:
+            raise ValueError(f"Unknown cube attribute: {attr}")
+        table, codes, labels = self.attributes[attr]
+        return codes[self.keys[table]], labels
+
+    def subset(self, mask):
+        """Sub-cube holding the facts where mask is True."""
+        keys = {table: positions[mask] for table, positions in self.keys.items()}
+        return SalesCube(keys, self.quantity[mask], self.total_sales[mask], self.attributes)
+
+    def _member_mask(self, attr, allowed_labels):
+        table, codes, labels = self.attributes[attr]
+        allowed = np.isin(labels, np.asarray(list(allowed_labels), dtype=object))
+        return allowed[codes][self.keys[table]]
+
+    def slice(self, attr, value):
+        """Fix one dimension attribute to a single value."""
+        return self.subset(self._member_mask(attr, [value]))
+
+    def dice(self, **filters):
+        """Keep facts whose attributes are in the given value lists, e.g. dice(year=[2011], month=[11, 12])."""
+        mask = np.ones(len(self), dtype=bool)
+        for attr, values in filters.items():
+            if attr not in self.attributes:
+                raise ValueError(f"Unknown cube attribute: {attr}")
+            mask &= self._member_mask(attr, values if isinstance(values, (list, tuple, set)) else [values])
+        return self.subset(mask)
+
+    def where_like(self, attr, pattern):
+        """Keep facts whose attribute matches a SQL LIKE pattern, e.g. where_like('description', '%HEART%')."""
+        table, codes, labels = self.attributes[attr]
+        matching = like_mask(labels, pattern)
+        return self.subset(matching[codes][self.keys[table]])
+
+    def _cells(self, columns, codes, weights_sales, weights_quantity, counts):
+        """Group rows by the code arrays of columns; return (cell codes per column, sales, quantity, count).
+
+        Cells come out in code order, i.e. ordered by the group_by labels.
+        """
+        if len(counts) == 0:
+            empty = np.empty(0, dtype=np.int64)
+            return [empty for _ in columns], np.empty(0), empty, empty
+        sizes = [len(self.attributes[col][2]) for col in columns]
+        n_cells = np.prod(sizes, dtype=float)
+        if n_cells < 2 ** 62:
+            key = np.zeros(len(counts), dtype=np.int64)
+            for col, size in zip(columns, sizes):
+                key = key * size + codes[col]
+            if n_cells <= min(MAX_DENSE_CELLS, 8 * len(counts) + 1024):
+                # Dense: one bincount slot per possible cell
+                n_cells = int(n_cells)
+                cells = None
+            else:
+                # Sparse: number the cells present
+                cells, key = np.unique(key, return_inverse=True)
+                n_cells = len(cells)
+            cell_codes = None
+        else:
+            # Too many combinations for an int64 key: number the distinct code tuples
+            uniq, key = np.unique(np.stack([codes[col] for col in columns], axis=1), axis=0, return_inverse=True)
+            key = key.ravel()
+            n_cells = len(uniq)
+            cells = np.arange(n_cells)
+            cell_codes = [uniq[:, i] for i in range(len(columns))]
+
+        count = np.bincount(key, weights=counts, minlength=n_cells)
+        sales = np.bincount(key, weights=weights_sales, minlength=n_cells)
+        quantity = np.bincount(key, weights=weights_quantity, minlength=n_cells)
+        if cells is None:
+            present = np.flatnonzero(count)
+            count, sales, quantity, cells = count[present], sales[present], quantity[present], present
+        if cell_codes is None:
+            cell_codes = list(np.unravel_index(cells, sizes)) if columns else []
+        return cell_codes, sales, np.rint(quantity).astype(np.int64), np.rint(count).astype(np.int64)
+
+    def _frame(self, columns, cell_codes, sales, quantity, count):
+        data = {col: self.attributes[col][2][c] for col, c in zip(columns, cell_codes)}
+        data.update(total_sales=sales, total_quantity=quantity, sale_count=count)
+        return pd.DataFrame(data)
+
+    def aggregate(self, group_by=()):
+        """Total sales, quantity and fact count per combination of group_by values (ordered by them).
+
+        Drill down by adding finer attributes (e.g. month, day), roll up by removing them.
+        """
+        group_by = list(group_by)
+        codes = {col: self.codes(col)[0] for col in group_by}
+        result = self._cells(group_by, codes, self.total_sales, self.quantity, np.ones(len(self)))
+        return self._frame(group_by, *result)
+
+    def grouping_sets(self, sets):
+        """Aggregate for each grouping set (a list of attributes) in one pass over the facts.
+
+        The facts are grouped once at the finest level (the union of all sets); every set is
+        then rolled up from those cells. Returns one DataFrame with attributes outside a
+        set as None and a grouping_id bitmask (bit set = attribute aggregated away, first
+        attribute most significant), like SQL's GROUPING_ID.
+        """
+        sets = [list(s) for s in sets]
+        union = list(dict.fromkeys(col for s in sets for col in s))
+        fine_codes, sales, quantity, count = self._cells(
+            union, {col: self.codes(col)[0] for col in union}, self.total_sales, self.quantity, np.ones(len(self)))
+        fine = dict(zip(union, fine_codes))
+        frames = []
+        for s in sets:
+            cell_codes, s_sales, s_quantity, s_count = self._cells(s, fine, sales, quantity, count)
+            df = self._frame(s, cell_codes, s_sales, s_quantity, s_count)
+            for col in union:
+                if col not in s:
+                    df[col] = None
+            df['grouping_id'] = sum(1 << (len(union) - 1 - i) for i, col in enumerate(union) if col not in s)
+            frames.append(df[union + MEASURES + ['grouping_id']])
+        return pd.concat(frames, ignore_index=True)
+
+    def rollup(self, columns):
+        """GROUP BY ROLLUP(columns): every prefix of columns, down to the grand total."""
+        columns = list(columns)
+        return self.grouping_sets([columns[:i] for i in range(len(columns), -1, -1)])
+
+    def cube(self, columns):
+        """GROUP BY CUBE(columns): every subset of columns."""
+        columns = list(columns)
+        return self.grouping_sets([list(s) for k in range(len(columns), -1, -1) for s in combinations(columns, k)])
+
+def rollup_query(cube):
+    """3.1.1 Roll-up: total sales by country, year and quarter."""
+    return cube.aggregate(['country', 'year', 'quarter'])[['country', 'year', 'quarter', 'total_sales']]
+
+def drill_down_query(cube, country='United Kingdom', year=2011, limit=50):
+    """3.1.2 Drill-down: day/product sales for one country and year."""
+    df = cube.dice(country=country, year=year).aggregate(['month', 'day', 'description'])
+    df = df.rename(columns={'total_sales': 'monthly_sales'})
+    df = df.sort_values(['month', 'day', 'total_quantity'], ascending=[True, True, False], kind='stable')
+    return df[['month', 'day', 'description', 'total_quantity', 'monthly_sales']].head(limit).reset_index(drop=True)
+
+def slice_query(cube, keyword='HEART'):
+    """3.1.3 Slice: sales by country for products whose description contains keyword."""
+    df = cube.where_like('description', f"%{keyword}%").aggregate(['country'])
+    df = df.rename(columns={'total_sales': 'heart_items_sales'})
+    df = df.sort_values('heart_items_sales', ascending=False, kind='stable')
+    return df[['country', 'heart_items_sales']].reset_index(drop=True)
+
+# The olap_queries.sql queries answered from the cube, with the same columns and row order
+BUNDLED_QUERIES = {
+    '3.1.1 Roll-Up Query': rollup_query,
+    '3.1.2 Drill-Down Query': drill_down_query,
+    '3.1.3 Slice Query': slice_query,
+}
+
+def same_result(expected, got):
+    """Same rows, with numbers equal up to float summation order.
+
+    Rows are compared in sorted order: SQLite leaves the order of ORDER BY ties undefined.
+    """
+    if list(expected.columns) != list(got.columns):
+        return False
+    expected = expected.sort_values(list(expected.columns), ignore_index=True)
+    got = got.sort_values(list(got.columns), ignore_index=True)
+    numeric = expected.select_dtypes('number').columns
+    return (expected.shape == got.shape
+            and expected.drop(columns=numeric).astype(object).equals(got.drop(columns=numeric).astype(object))
+            and np.allclose(expected[numeric].to_numpy(float), got[numeric].to_numpy(float)))
+
+def best_time(run, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = run()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+if __name__ == "__main__":
+    from olap_sql import load_olap_queries
+
+    parser = argparse.ArgumentParser(description="In-memory OLAP cube over the retail warehouse")
+    parser.add_argument('--db', default=DB_FILE)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    cube = SalesCube.from_db(args.db)
+    print(f"Loaded {len(cube)} facts into the cube in {time.perf_counter() - start:.2f}s")
+
+    conn = sqlite3.connect(args.db)
+    try:
+        print(f"\n{'Query':<26} {'SQL (ms)':>10} {'Cube (ms)':>10}  Same result")
+        for name, sql in load_olap_queries():
+            if name not in BUNDLED_QUERIES:
+                continue
+            sql_time, expected = best_time(lambda: pd.read_sql_query(sql, conn), args.repeat)
+            cube_time, got = best_time(lambda: BUNDLED_QUERIES[name](cube), args.repeat)
+            print(f"{name:<26} {sql_time * 1000:>10.2f} {cube_time * 1000:>10.2f}  {same_result(expected, got)}")
+    finally:
+        conn.close()
+
+    print("\nROLLUP(country, year), one pass over the facts:")
+    print(cube.rollup(['country', 'year']).tail(5))
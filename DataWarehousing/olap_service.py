@@ -0,0 +1,229 @@
+import pandas as pd
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from fact_partitions import route_query
+from olap_aggregates import DB_FILE, rollup_sales
+from product_search import slice_sales
+
+# Parameterized version of the olap_queries.sql drill-down (roll-up and slice go through
+# rollup_sales and slice_sales)
+QUERIES = {
+    'drill_down': """
+        SELECT
+            t.month,
+            t.day,
+            p.description,
+            SUM(f.quantity) as total_quantity,
+            SUM(f.total_sales) as monthly_sales
+        FROM SalesFact f
+        JOIN CustomerDim c ON f.customer_id = c.customer_id
+        JOIN TimeDim t ON f.time_id = t.time_id
+        JOIN ProductDim p ON f.product_id = p.product_id
+        WHERE c.country = :country AND t.year = :year
+        GROUP BY t.month, t.day, p.description
+        ORDER BY t.month, t.day, total_quantity DESC
+        LIMIT :limit
+    """,
+}
+
+class ResultCache:
+    """Thread-safe LRU cache of query results with a total size budget in bytes."""
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.used_bytes = 0
+        self.hits = self.misses = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def put(self, key, df):
+        size = int(df.memory_usage(index=True, deep=True).sum())
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._items:
+                self.used_bytes -= self._items.pop(key)[1]
+            self._items[key] = (df, size)
+            self.used_bytes += size
+            while self.used_bytes > self.max_bytes:
+                _, (_, evicted) = self._items.popitem(last=False)
+                self.used_bytes -= evicted
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self.used_bytes = 0
+
+class OlapService:
+    """Read-only OLAP queries over the warehouse for dashboards.
+
+    Queries run on a pool of read-only connections (WAL journal, memory-mapped I/O, statement
+    cache) so many threads can read at once. Results are kept in a ResultCache that is cleared
+    whenever a load commits: a watcher connection polls PRAGMA data_version, which changes on
+    every commit from another connection, and the file's identity (device, inode), which
+    changes when init_db recreates the database (the pool is reopened then). A result is
+    only cached if no invalidation happened while its query ran.
+    """
+
+    def __init__(self, db_file=DB_FILE, pool_size=4, cache_bytes=64 * 1024 * 1024,
+                 mmap_size=256 * 1024 * 1024, shared_cache=False):
+        # shared_cache=True makes the pool share one page cache, but SQLite then serializes
+        # readers on table-level locks; mmap already shares pages through the OS, so it is off by default.
+        self.db_file = os.path.abspath(db_file)
+        self.pool_size = pool_size
+        self.mmap_size = mmap_size
+        self.shared_cache = shared_cache
+        self.cache = ResultCache(cache_bytes)
+        self._lock = threading.Lock()
+        self._pool = None
+        # Bumped on every invalidation; results of queries that straddle one are not cached
+        self._generation = 0
+        self._open()
+
+    def _connect(self):
+        uri = f"file:{self.db_file}?mode=ro" + ("&cache=shared" if self.shared_cache else "")
+        conn = sqlite3.connect(uri, uri=True, check_same_thread=False, cached_statements=256)
+        conn.execute(f"PRAGMA mmap_size = {int(self.mmap_size)}")
+        conn.execute("PRAGMA query_only = ON")
+        return conn
+
+    def _open(self):
+        # WAL lets readers run alongside a writer; the mode is stored in the file, so set it once
+        writer = sqlite3.connect(self.db_file)
+        try:
+            writer.execute("PRAGMA journal_mode = WAL")
+        finally:
+            writer.close()
+        self._file_id = self._stat_id()
+        self._watcher = self._connect()
+        self._data_version = self._watcher.execute("PRAGMA data_version").fetchone()[0]
+        self._pool = queue.LifoQueue()
+        for _ in range(self.pool_size):
+            self._pool.put(self._connect())
+
+    def _stat_id(self):
+        # The watcher keeps the old inode open, so a recreated file cannot get it back while
+        # the service runs. ctime is left out: a WAL checkpoint changes it on the same file.
+        stat = os.stat(self.db_file)
+        return (stat.st_dev, stat.st_ino)
+
+    def _clear(self):
+        # Caller holds self._lock
+        self._generation += 1
+        self.cache.clear()
+
+    def close(self):
+        with self._lock:
+            while not self._pool.empty():
+                self._pool.get_nowait().close()
+            self._watcher.close()
+            # Connections still borrowed are closed when they come back (see connection)
+            self._pool = None
+
+    def _check_version(self):
+        """Clear the cache (and reopen on a new file) if the warehouse changed since the last call.
+
+        Returns the cache generation the caller's query runs under.
+        """
+        with self._lock:
+            if self._stat_id() != self._file_id:
+                while not self._pool.empty():
+                    self._pool.get_nowait().close()
+                self._watcher.close()
+                self._clear()
+                self._open()
+                return self._generation
+            version = self._watcher.execute("PRAGMA data_version").fetchone()[0]
+            if version != self._data_version:
+                self._data_version = version
+                self._clear()
+            return self._generation
+
+    def invalidate(self):
+        """Drop all cached results (e.g. after a load in this process)."""
+        with self._lock:
+            self._clear()
+
+    @contextmanager
+    def connection(self):
+        """Borrow a pooled read-only connection; blocks while all are in use."""
+        pool = self._pool
+        conn = pool.get()
+        try:
+            yield conn
+        finally:
+            with self._lock:
+                # A pool replaced by a reopen (or close) is gone: its connections are closed
+                returned = pool is self._pool
+                if returned:
+                    pool.put(conn)
+            if not returned:
+                conn.close()
+
+    def _cached(self, key, run):
+        generation = self._check_version()
+        df = self.cache.get(key)
+        if df is None:
+            with self.connection() as conn:
+                df = run(conn)
+            with self._lock:
+                # Another client saw a commit while this query ran: its result may predate it
+                if generation == self._generation:
+                    self.cache.put(key, df)
+        return df.copy()
+
+    def query(self, name, **params):
+        """Run one of the named QUERIES with its parameters."""
+        key = (name, tuple(sorted(params.items())))
+        return self._cached(key, lambda conn: pd.read_sql_query(route_query(conn, QUERIES[name], params),
+                                                                  conn, params=params))
+
+    def rollup(self, group_by=('country', 'year', 'quarter'), **filters):
+        """3.1.1 Roll-up, served from the aggregate tables where possible (see rollup_sales)."""
+        key = ('rollup', tuple(group_by), tuple(sorted(filters.items())))
+        return self._cached(key, lambda conn: rollup_sales(list(group_by), filters, conn=conn))
+
+    def drill_down(self, country='United Kingdom', year=2011, limit=50):
+        """3.1.2 Drill-down: day/product sales for one country and year."""
+        return self.query('drill_down', country=country, year=year, limit=limit)
+
+    def slice(self, keyword='HEART'):
+        """3.1.3 Slice: sales by country for products whose description contains keyword."""
+        return self._cached(('slice', keyword), lambda conn: slice_sales(keyword, conn=conn))
+
+    def top_countries(self, n=10):
+        """Top n countries by total sales (the visualize_data query)."""
+        df = self.rollup(('country',))
+        return df.sort_values('total_sales', ascending=False).head(n).reset_index(drop=True)
+
+if __name__ == "__main__":
+    service = OlapService()
+    try:
+        for label, call in [('Roll-up', service.rollup), ('Drill-down', service.drill_down),
+                            ('Slice', service.slice), ('Top countries', service.top_countries)]:
+            start = time.perf_counter()
+            call()
+            cold = time.perf_counter() - start
+            start = time.perf_counter()
+            call()
+            warm = time.perf_counter() - start
+            print(f"{label:<15} cold {cold * 1000:8.2f} ms   cached {warm * 1000:8.3f} ms")
+        print(f"Cache: {service.cache.hits} hits, {service.cache.misses} misses, {service.cache.used_bytes} bytes")
+    finally:
+        service.close()
@@ -0,0 +1,67 @@
+import os
+import sqlite3
+import time
+
+from fact_partitions import route_query
+
+# Define paths (sqlite3 only: the 'olap' pipeline command starts without pandas)
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DB_FILE = os.path.join(BASE_DIR, '..', 'DataWarehousing', 'retail_dw.db')
+OLAP_FILE = os.path.join(BASE_DIR, '..', 'DataWarehousing', 'olap_queries.sql')
+
+# Query: Total Sales by Country (Top 10), used by visualize_data
+TOP_COUNTRIES_QUERY = """
+SELECT 
+    c.country,
+    SUM(f.total_sales) as total_sales
+FROM SalesFact f
+JOIN CustomerDim c ON f.customer_id = c.customer_id
+GROUP BY c.country
+ORDER BY total_sales DESC
+LIMIT 10;
+"""
+
+def load_olap_queries():
+    """Read olap_queries.sql into (name, sql) pairs, named after their '-- 3.1.x' heading."""
+    with open(OLAP_FILE, 'r') as f:
+        lines = f.read().splitlines()
+    queries = []
+    name, statement = None, ''
+    for line in lines:
+        stripped = line.strip()
+        if stripped.startswith('-- 3.'):
+            name = stripped[3:]
+        if not statement and (not stripped or stripped.startswith('--')):
+            continue
+        statement += line + '\n'
+        if sqlite3.complete_statement(statement):
+            queries.append((name, statement.strip()))
+            statement = ''
+    queries.append(('3.2 Top 10 Countries (visualize_data)', TOP_COUNTRIES_QUERY.strip()))
+    return queries
+
+def format_table(columns, rows):
+    """Plain-text table: columns padded to their widest value, numbers right-aligned."""
+    cells = [[f"{v:.2f}" if isinstance(v, float) else str(v) for v in row] for row in rows]
+    widths = [max([len(c)] + [len(row[i]) for row in cells]) for i, c in enumerate(columns)]
+    numeric = [bool(rows) and all(isinstance(row[i], (int, float)) for row in rows) for i in range(len(columns))]
+    lines = ['  '.join(c.rjust(w) if n else c.ljust(w) for c, w, n in zip(columns, widths, numeric))]
+    for row in cells:
+        lines.append('  '.join(v.rjust(w) if n else v.ljust(w) for v, w, n in zip(row, widths, numeric)))
+    return '\n'.join(lines)
+
+def print_olap_queries(db_file=DB_FILE, match=None, limit=20):
+    """Run the bundled OLAP queries (those whose name contains match) and print up to limit rows each."""
+    conn = sqlite3.connect(f"file:{db_file}?mode=ro", uri=True)
+    try:
+        for name, query in load_olap_queries():
+            if match and match.lower() not in name.lower():
+                continue
+            start = time.perf_counter()
+            cursor = conn.execute(route_query(conn, query))
+            rows = cursor.fetchall()
+            elapsed = time.perf_counter() - start
+            print(f"\n--- {name} ({len(rows)} rows, {elapsed * 1000:.1f} ms) ---")
+            print(format_table([d[0] for d in cursor.description], rows[:limit]))
+    finally:
+        conn.close()
@@ -0,0 +1,114 @@
+import pandas as pd
+import json
+import os
+import sqlite3
+
+# Define paths
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DB_FILE = os.path.join(BASE_DIR, '..', 'DataWarehousing', 'retail_dw.db')
+
+# FTS5 index over ProductDim.description. The trigram tokenizer lets LIKE '%kw%' use the index
+# (for keywords of 3+ characters); content='ProductDim' stores only the index, not a copy of the text.
+SEARCH_TABLE = 'ProductSearch'
+SEARCH_DDL = f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5(
+        description, content='ProductDim', content_rowid='product_id', tokenize='trigram'
+    )
+"""
+
+# Above this share of matching products, walking SalesFact per product is slower than the
+# customer-ordered scan SQLite picks for the plain LIKE join
+BROAD_MATCH_FRACTION = 0.25
+
+def build_product_search(conn):
+    """(Re)build the description index from ProductDim. Does not commit.
+
+    Returns False if this SQLite lacks FTS5 or the trigram tokenizer (3.34+); slices then
+    fall back to scanning ProductDim.
+    """
+    try:
+        conn.execute(SEARCH_DDL)
+    except sqlite3.OperationalError as e:
+        print(f"Product search index not available ({e}); slices will scan ProductDim.")
+        return False
+    conn.execute(f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('rebuild')")
+    return True
+
+def has_product_search(conn):
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (SEARCH_TABLE,)).fetchone() is not None
+
+def matching_products_sql(conn):
+    """Subquery of product_ids whose description is LIKE :pattern.
+
+    The index narrows the candidates (CROSS JOIN keeps it the outer loop) and
+    ProductDim.description is re-checked with the same LIKE, so the result is exactly the
+    LIKE result (including case folding of non-ASCII text).
+    """
+    if has_product_search(conn):
+        return f"""
+            SELECT p.product_id FROM {SEARCH_TABLE} s
+            CROSS JOIN ProductDim p ON p.product_id = s.rowid
+            WHERE s.description LIKE :pattern AND p.description LIKE :pattern
+        """
+    return "SELECT product_id FROM ProductDim WHERE description LIKE :pattern"
+
+def search_products(keyword, conn=None):
+    """product_ids whose description contains keyword (LIKE '%keyword%' semantics)."""
+    own_conn = conn is None
+    if own_conn:
+        conn = sqlite3.connect(DB_FILE)
+    try:
+        rows = conn.execute(matching_products_sql(conn), {'pattern': f"%{keyword}%"}).fetchall()
+        return [product_id for (product_id,) in rows]
+    finally:
+        if own_conn:
+            conn.close()
+
+def slice_sales(keyword, conn=None):
+    """3.1.3 Slice: sales by country for products whose description contains keyword.
+
+    Same result as the olap_queries.sql slice with LIKE '%keyword%', but the keyword is
+    resolved to product_ids through the index once, and SalesFact is read through
+    idx_salesfact_product for those products only. Keywords matching more than
+    BROAD_MATCH_FRACTION of the products run as the plain LIKE join instead.
+    """
+    own_conn = conn is None
+    if own_conn:
+        conn = sqlite3.connect(DB_FILE)
+    try:
+        pattern = f"%{keyword}%"
+        product_ids = search_products(keyword, conn)
+        products = conn.execute("SELECT COUNT(*) FROM ProductDim").fetchone()[0]
+        if len(product_ids) > BROAD_MATCH_FRACTION * products:
+            from_clause = "SalesFact f JOIN ProductDim p ON f.product_id = p.product_id"
+            where = "p.description LIKE :pattern"
+        else:
+            from_clause = "SalesFact f"
+            # The ids found above as one JSON array parameter (no limit on bound variables)
+            where = "f.product_id IN (SELECT value FROM json_each(:product_ids))"
+        query = f"""
+            SELECT
+                c.country,
+                SUM(f.total_sales) as slice_sales
+            FROM {from_clause}
+            JOIN CustomerDim c ON f.customer_id = c.customer_id
+            WHERE {where}
+            GROUP BY c.country
+            ORDER BY slice_sales DESC
+        """
+        return pd.read_sql_query(query, conn, params={'pattern': pattern, 'product_ids': json.dumps(product_ids)})
+    finally:
+        if own_conn:
+            conn.close()
+
+if __name__ == "__main__":
+    conn = sqlite3.connect(DB_FILE)
+    try:
+        if not has_product_search(conn):
+            build_product_search(conn)
+            conn.commit()
+        print(f"'HEART' matches {len(search_products('HEART', conn))} products.")
+        print("3.1.3 Slice (HEART):")
+        print(slice_sales('HEART', conn).head(10))
+    finally:
+        conn.close()
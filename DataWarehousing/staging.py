@@ -0,0 +1,128 @@
+import pandas as pd
+import hashlib
+import json
+import os
+import shutil
+
+from etl_retail import BASE_DIR, CHUNK_SIZE, TARGET_DATE, extract_data_chunked, prepare_sales
+
+# Staged copies of the cleaned source, one directory per source file version
+STAGING_DIR = os.path.join(BASE_DIR, '..', 'DataWarehousing', 'staging')
+# Remembers the content hash of (path, size, mtime) so unchanged files are not re-hashed
+HASH_CACHE_FILE = os.path.join(STAGING_DIR, 'source_hashes.json')
+
+def source_key(file_path):
+    """SHA-256 of the source file, reused from the hash cache while its size and mtime are unchanged."""
+    stat = os.stat(file_path)
+    cache_key = f"{os.path.abspath(file_path)}|{stat.st_size}|{stat.st_mtime_ns}"
+    cache = {}
+    if os.path.exists(HASH_CACHE_FILE):
+        with open(HASH_CACHE_FILE, 'r') as f:
+            cache = json.load(f)
+    if cache_key not in cache:
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        cache[cache_key] = digest.hexdigest()
+        os.makedirs(STAGING_DIR, exist_ok=True)
+        with open(HASH_CACHE_FILE, 'w') as f:
+            json.dump(cache, f, indent=2)
+    return cache[cache_key]
+
+def read_manifest(path):
+    """Manifest of a staged dataset, or None if it is missing or incomplete."""
+    manifest_file = os.path.join(path, 'manifest.json')
+    if not os.path.exists(manifest_file):
+        return None
+    with open(manifest_file, 'r') as f:
+        return json.load(f)
+
+def stage_extract(file_path, chunksize=CHUNK_SIZE):
+    """Write the cleaned, typed sales rows of file_path to Parquet partitioned by year/month.
+
+    Rows get the output of prepare_sales (CustomerID present, parsed InvoiceDate, TotalSales)
+    plus source_row, their position in the CSV, so readers can restore the original order.
+    The dataset lives under STAGING_DIR/<sha256 of the file> (Parquet files in data/, next
+    to manifest.json) and is reused while the file is unchanged. Returns the dataset path.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    print(f"\n--- STAGING PHASE ---")
+    path = os.path.join(STAGING_DIR, source_key(file_path))
+    manifest = read_manifest(path)
+    if manifest is not None:
+        print(f"Reusing staged data: {path} ({manifest['rows']} rows)")
+        return path
+
+    # Write to a temporary directory and rename at the end so a crash never leaves a half-staged dataset
+    tmp_path = path + '.tmp'
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    rows_in = rows_out = 0
+    min_date = max_date = None
+    for i, chunk in enumerate(extract_data_chunked(file_path, chunksize)):
+        df = prepare_sales(chunk)
+        # read_csv numbers chunk rows continuously, so the index is the row position in the file
+        df = df.assign(source_row=df.index.to_numpy(),
+                       year=df['InvoiceDate'].dt.year,
+                       month=df['InvoiceDate'].dt.month)
+        rows_in += len(chunk)
+        if df.empty:
+            continue
+        rows_out += len(df)
+        if min_date is None or df['InvoiceDate'].min() < min_date:
+            min_date = df['InvoiceDate'].min()
+        if max_date is None or df['InvoiceDate'].max() > max_date:
+            max_date = df['InvoiceDate'].max()
+        pq.write_to_dataset(pa.Table.from_pandas(df, preserve_index=False), os.path.join(tmp_path, 'data'),
+                            partition_cols=['year', 'month'], basename_template=f'part-{i:05d}-{{i}}.parquet')
+        print(f"Staged {rows_in} rows...")
+
+    stat = os.stat(file_path)
+    manifest = {
+        'source': os.path.abspath(file_path),
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'rows_read': rows_in,
+        'rows': rows_out,
+        'min_invoice_date': str(min_date),
+        'max_invoice_date': str(max_date),
+        'created_at': str(pd.Timestamp.now().floor('s')),
+    }
+    os.makedirs(tmp_path, exist_ok=True)
+    with open(os.path.join(tmp_path, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f, indent=2)
+    shutil.rmtree(path, ignore_errors=True)
+    os.rename(tmp_path, path)
+    print(f"Staged {rows_out} of {rows_in} rows to {path}")
+    return path
+
+def read_staged(path, columns=None, start=None, end=None):
+    """Read staged sales rows in source order.
+
+    Only the year/month partitions overlapping [start, end] (source dates) and the
+    requested columns are read.
+    """
+    manifest = read_manifest(path)
+    if manifest is None:
+        raise FileNotFoundError(f"No complete staged dataset at {path}")
+    filters = None
+    if start is not None or end is not None:
+        start = pd.Timestamp(start) if start is not None else pd.Timestamp(manifest['min_invoice_date'])
+        end = pd.Timestamp(end) if end is not None else pd.Timestamp(manifest['max_invoice_date'])
+        months = pd.period_range(start.to_period('M'), end.to_period('M'), freq='M')
+        filters = [[('year', '=', p.year), ('month', '=', p.month)] for p in months]
+    read_columns = None if columns is None else list(dict.fromkeys(list(columns) + ['source_row']))
+    df = pd.read_parquet(os.path.join(path, 'data'), columns=read_columns, filters=filters)
+    df = df.sort_values('source_row', kind='stable').reset_index(drop=True)
+    if columns is None:
+        return df.drop(columns=['source_row', 'year', 'month'])
+    return df[list(columns)]
+
+def read_staged_window(path, columns=None):
+    """Staged rows that can fall in transform_data's one-year window, read from the matching partitions only."""
+    max_date = pd.Timestamp(read_manifest(path)['max_invoice_date'])
+    # The window [TARGET_DATE - 1 year, TARGET_DATE] in source dates (before the date shift)
+    start = TARGET_DATE - pd.DateOffset(years=1) - (TARGET_DATE - max_date)
+    return read_staged(path, columns=columns, start=start, end=max_date)
@@ -0,0 +1,142 @@
+import pandas as pd
+import argparse
+import numpy as np
+import os
+
+# Define paths
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+BENCH_DIR = os.path.join(BASE_DIR, '..', 'DataWarehousing', 'bench_data')
+
+# Rows generated per write, bounds memory for 10^8-row files
+GEN_CHUNK_SIZE = 1_000_000
+
+# Country shares of customers, roughly as in the Online Retail dataset
+COUNTRIES = {
+    'United Kingdom': 0.89, 'Germany': 0.022, 'France': 0.020, 'EIRE': 0.007, 'Spain': 0.007,
+    'Netherlands': 0.005, 'Belgium': 0.006, 'Switzerland': 0.005, 'Portugal': 0.005,
+    'Australia': 0.003, 'Norway': 0.003, 'Italy': 0.004, 'Channel Islands': 0.002,
+    'Finland': 0.002, 'Cyprus': 0.002, 'Sweden': 0.002, 'Denmark': 0.002, 'Japan': 0.002,
+    'Poland': 0.002, 'USA': 0.002, 'Austria': 0.002, 'Unspecified': 0.001,
+}
+WORDS = ['HEART', 'WHITE', 'HANGING', 'HOLDER', 'T-LIGHT', 'RED', 'RETROSPOT', 'BAG', 'LUNCH', 'JUMBO',
+         'VINTAGE', 'SET', 'OF', 'CAKE', 'CASES', 'GLASS', 'STAR', 'CHRISTMAS', 'PAPER', 'CHAIN', 'KIT',
+         'WOODEN', 'FRAME', 'BOX', 'PINK', 'BLUE', 'LANTERN', 'METAL', 'SIGN', 'MUG', 'TEA', 'CUP', 'DOILY']
+
+def make_catalog(n_products, rng):
+    """StockCode, Description and base UnitPrice per product, plus Zipf-like sale weights."""
+    numbers = rng.choice(np.arange(10000, 90000), size=n_products, replace=False)
+    suffixes = rng.choice(['', '', '', 'A', 'B', 'C', 'L', 'P'], size=n_products)
+    codes = np.array([f"{n}{s}" for n, s in zip(numbers, suffixes)], dtype=object)
+    codes[:4] = ['POST', 'M', 'DOT', 'C2'][:min(4, n_products)]
+    lengths = rng.integers(2, 6, size=n_products)
+    descriptions = np.array([' '.join(rng.choice(WORDS, size=k)) for k in lengths], dtype=object)
+    prices = np.round(rng.lognormal(mean=0.9, sigma=0.9, size=n_products), 2)
+    weights = 1.0 / np.arange(1, n_products + 1) ** 0.9
+    weights = rng.permutation(weights / weights.sum())
+    return codes, descriptions, prices, weights
+
+def make_customers(n_customers, rng):
+    """CustomerID and Country per customer, plus purchase-frequency weights."""
+    ids = np.arange(12346, 12346 + n_customers)
+    names = list(COUNTRIES)
+    shares = np.array(list(COUNTRIES.values()))
+    countries = rng.choice(names, size=n_customers, p=shares / shares.sum())
+    weights = rng.pareto(1.2, size=n_customers) + 1
+    return ids, countries, weights / weights.sum()
+
+def format_invoice_dates(stamps):
+    """Timestamps in the source file's format, e.g. '12/1/2010 8:26' (no zero padding)."""
+    parts = pd.DataFrame({'m': stamps.month, 'd': stamps.day, 'y': stamps.year, 'H': stamps.hour, 'M': stamps.minute})
+    text = (parts['m'].astype(str) + '/' + parts['d'].astype(str) + '/' + parts['y'].astype(str) + ' '
+            + parts['H'].astype(str) + ':' + parts['M'].astype(str).str.zfill(2))
+    return text.to_numpy()
+
+def generate_online_retail(path, n_rows, seed=42, n_products=4000, n_customers=4400,
+                           start='2010-12-01', end='2011-12-09', chunk_size=GEN_CHUNK_SIZE):
+    """Write an n_rows CSV with the Online Retail columns and rough distributions.
+
+    Invoices hold ~20 lines on average and share one customer, country and timestamp;
+    about 2% are cancellations ('C' prefix, negative Quantity); ~25% of invoices have no
+    CustomerID; a few descriptions are missing and some prices are zero. Rows are written
+    in chunk_size batches, so memory stays flat up to 10^8 rows.
+    """
+    rng = np.random.default_rng(seed)
+    codes, descriptions, prices, product_weights = make_catalog(n_products, rng)
+    customer_ids, customer_countries, customer_weights = make_customers(n_customers, rng)
+    start_ts, end_ts = pd.Timestamp(start), pd.Timestamp(end)
+    span_days = (end_ts - start_ts).days + 1
+    invoice_no = 536365
+    written = 0
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='ISO-8859-1', newline='') as f:
+        f.write('InvoiceNo,StockCode,Description,Quantity,InvoiceDate,UnitPrice,CustomerID,Country\n')
+        while written < n_rows:
+            rows = min(chunk_size, n_rows - written)
+            # Invoice structure: lines per invoice, then per-invoice attributes broadcast to lines
+            lines = rng.geometric(1 / 20, size=rows // 5 + 10)
+            lines = lines[np.cumsum(lines) - lines < rows]
+            lines[-1] -= lines.sum() - rows
+            n_invoices = len(lines)
+            # Dates advance with the row position so invoices come out in time order, like the source file
+            position = (written + np.cumsum(lines) - lines) / n_rows
+            days = np.minimum((position * span_days).astype(int), span_days - 1)
+            minutes = rng.integers(8 * 60, 20 * 60, size=n_invoices)
+            stamps = start_ts + pd.to_timedelta(days, unit='D') + pd.to_timedelta(minutes, unit='m')
+            stamps = stamps.sort_values()
+            cancelled = rng.random(n_invoices) < 0.02
+            customer = rng.choice(len(customer_ids), size=n_invoices, p=customer_weights)
+            anonymous = rng.random(n_invoices) < 0.25
+
+            inv = np.repeat(np.arange(invoice_no, invoice_no + n_invoices), lines)
+            invoice_no += n_invoices
+            is_cancel = np.repeat(cancelled, lines)
+            product = rng.choice(n_products, size=rows, p=product_weights)
+            quantity = np.maximum(1, rng.lognormal(1.3, 1.0, size=rows).astype(int))
+            quantity[is_cancel] *= -1
+            unit_price = prices[product] * rng.choice([1.0, 1.0, 1.0, 0.85, 1.25], size=rows)
+            unit_price[rng.random(rows) < 0.002] = 0.0
+            description = descriptions[product].copy()
+            description[rng.random(rows) < 0.003] = None
+            cust = np.repeat(customer, lines)
+            customer_id = customer_ids[cust].astype(float)
+            customer_id[np.repeat(anonymous, lines)] = np.nan
+
+            chunk = pd.DataFrame({
+                'InvoiceNo': np.char.add(np.where(is_cancel, 'C', ''), inv.astype(str)),
+                'StockCode': codes[product],
+                'Description': description,
+                'Quantity': quantity,
+                'InvoiceDate': np.repeat(format_invoice_dates(stamps), lines),
+                'UnitPrice': np.round(unit_price, 2),
+                'CustomerID': customer_id,
+                'Country': customer_countries[cust],
+            })
+            chunk.to_csv(f, header=False, index=False)
+            written += rows
+            print(f"Generated {written}/{n_rows} rows...")
+    os.replace(tmp_path, path)
+    return path
+
+def dataset_path(n_rows, seed=42):
+    """Cached location of the synthetic dataset of a given size."""
+    return os.path.join(BENCH_DIR, f"online_retail_{n_rows}_seed{seed}.csv")
+
+def ensure_dataset(n_rows, seed=42):
+    """Path to the n_rows synthetic dataset, generating it on first use."""
+    path = dataset_path(n_rows, seed)
+    if not os.path.exists(path):
+        print(f"\n--- GENERATING {n_rows} SYNTHETIC ROWS ---")
+        generate_online_retail(path, n_rows, seed=seed)
+    return path
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Synthetic Online Retail data generator")
+    parser.add_argument('rows', type=float, help="number of rows, e.g. 1e6")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help="CSV path (default: cached under DataWarehousing/bench_data)")
+    args = parser.parse_args()
+    n_rows = int(args.rows)
+    path = generate_online_retail(args.output, n_rows, seed=args.seed) if args.output else ensure_dataset(n_rows, args.seed)
+    print(f"Synthetic dataset saved to: {path}")
@@ -0,0 +1,43 @@
+-- DSA 2040 FS 2025: Data Warehouse Physical Design
+-- Indexes for the star schema in warehouse_schema.sql.
+-- Run AFTER the bulk load (building them once is much cheaper than maintaining them per insert),
+-- followed by ANALYZE so the query planner has statistics.
+
+-- ==========================================
+-- Fact Table
+-- ==========================================
+
+-- Roll-up (country x quarter) and drill-down (one country, one year):
+-- starts from the customers of a country and covers every column those queries read.
+CREATE INDEX IF NOT EXISTS idx_salesfact_customer_time
+    ON SalesFact (customer_id, time_id, product_id, quantity, total_sales);
+
+-- Slice by product (e.g. description LIKE '%HEART%'): product -> customer -> measure.
+CREATE INDEX IF NOT EXISTS idx_salesfact_product
+    ON SalesFact (product_id, customer_id, total_sales);
+
+-- Time-bounded queries (date ranges on time_id).
+CREATE INDEX IF NOT EXISTS idx_salesfact_time
+    ON SalesFact (time_id, customer_id, total_sales);
+
+-- Invoice lookups and basket (invoice -> products) reads.
+CREATE INDEX IF NOT EXISTS idx_salesfact_invoice
+    ON SalesFact (invoice_no, product_id);
+
+-- ==========================================
+-- Dimension Tables
+-- ==========================================
+
+-- Slice/dice by country (customer_id is the rowid, so the index covers the join key).
+CREATE INDEX IF NOT EXISTS idx_customerdim_country
+    ON CustomerDim (country);
+
+-- Roll-up / drill-down along the time hierarchy.
+CREATE INDEX IF NOT EXISTS idx_timedim_year_quarter_month
+    ON TimeDim (year, quarter, month, day);
+
+-- Description scans read this narrow index instead of the table; stock_code serves loader lookups.
+CREATE INDEX IF NOT EXISTS idx_productdim_description
+    ON ProductDim (description);
+CREATE INDEX IF NOT EXISTS idx_productdim_stock_code
+    ON ProductDim (stock_code);
@@ -15,7 +15,8 @@ CREATE TABLE IF NOT EXISTS CustomerDim (
     source_customer_id TEXT, -- Original ID from source data
     name TEXT, -- Placeholder if name isn't available
     country TEXT,
-    city TEXT -- Optional if available
+    city TEXT, -- Optional if available
+    segment INTEGER -- RFM segment, written by DataMining/customer_segments.py
 );
 
 -- 2. Product Dimension
@@ -42,6 +43,8 @@ CREATE TABLE IF NOT EXISTS TimeDim (
 -- ==========================================
 
 -- Sales Fact Table
+-- (etl_retail.py --partition month|quarter replaces it with per-period tables behind a
+-- SalesFact view, see fact_partitions.py)
 CREATE TABLE IF NOT EXISTS SalesFact (
     sale_id INTEGER PRIMARY KEY AUTOINCREMENT,
     customer_id INTEGER,
@@ -55,3 +58,56 @@ CREATE TABLE IF NOT EXISTS SalesFact (
     FOREIGN KEY (product_id) REFERENCES ProductDim(product_id),
     FOREIGN KEY (time_id) REFERENCES TimeDim(time_id)
 );
+
+-- ==========================================
+-- Aggregate Tables (materialized roll-ups, see olap_aggregates.py)
+-- ==========================================
+-- country is '' for customers without a Country so it can be part of the key.
+
+-- Sales by Country and Quarter
+CREATE TABLE IF NOT EXISTS AggSalesCountryQuarter (
+    country TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    quarter INTEGER NOT NULL,
+    total_sales REAL,
+    total_quantity INTEGER,
+    sale_count INTEGER,
+    PRIMARY KEY (country, year, quarter)
+);
+
+-- Sales by Country and Month
+CREATE TABLE IF NOT EXISTS AggSalesCountryMonth (
+    country TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    quarter INTEGER NOT NULL,
+    month INTEGER NOT NULL,
+    total_sales REAL,
+    total_quantity INTEGER,
+    sale_count INTEGER,
+    PRIMARY KEY (country, year, quarter, month)
+);
+
+-- Sales by Product and Month
+CREATE TABLE IF NOT EXISTS AggSalesProductMonth (
+    product_id INTEGER NOT NULL,
+    year INTEGER NOT NULL,
+    quarter INTEGER NOT NULL,
+    month INTEGER NOT NULL,
+    total_sales REAL,
+    total_quantity INTEGER,
+    sale_count INTEGER,
+    PRIMARY KEY (product_id, year, quarter, month)
+);
+
+-- ==========================================
+-- ETL Metadata
+-- ==========================================
+
+-- Load State (high-water mark for incremental loads)
+CREATE TABLE IF NOT EXISTS LoadState (
+    id INTEGER PRIMARY KEY CHECK (id = 1), -- single row
+    last_invoice_date TEXT, -- latest source InvoiceDate loaded (before the date shift)
+    time_shift TEXT, -- offset applied to InvoiceDate, reused so time_id stays stable
+    loaded_at TEXT,
+    aggregated_sale_id INTEGER DEFAULT 0 -- last SalesFact.sale_id folded into the aggregate tables
+);
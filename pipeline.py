@@ -0,0 +1,203 @@
+"""Single entry point for the warehouse and mining stages.
+
+    python pipeline.py etl [etl_retail.py options]      full ETL, indexes and chart
+    python pipeline.py load-only [etl_retail.py options] ETL without the chart
+    python pipeline.py olap [--match 3.1.1]              print the bundled OLAP queries
+    python pipeline.py cluster [--warehouse]             Iris K-Means or RFM customer segments
+    python pipeline.py classify [--warehouse]            Iris DT vs KNN or the warehouse model grid
+    python pipeline.py basket [--warehouse]              synthetic or warehouse association rules
+    python pipeline.py budget                            check stage import times against IMPORT_BUDGETS
+
+Only argparse and the standard library are imported up front; each command imports its
+stage modules (and through them pandas, sklearn, ...) when it runs, and plots with the
+headless Agg backend.
+"""
+import argparse
+import importlib
+import os
+import sys
+import time
+
+# Define paths
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STAGE_DIRS = [os.path.join(BASE_DIR, 'DataWarehousing'), os.path.join(BASE_DIR, 'DataMining')]
+
+# Module each command (and its --warehouse variant) imports before it starts work
+STAGE_MODULES = {
+    'etl': 'etl_retail',
+    'load-only': 'etl_retail',
+    'olap': 'olap_sql',
+    'cluster': 'clustering_iris',
+    'cluster --warehouse': 'customer_segments',
+    'classify': 'mining_iris_basket',
+    'classify --warehouse': 'model_eval',
+    'basket': 'mining_iris_basket',
+    'basket --warehouse': 'warehouse_baskets',
+}
+# Seconds allowed for that import in a fresh interpreter (about twice the time measured
+# on a 1-CPU dev container); check with 'python pipeline.py budget'
+IMPORT_BUDGETS = {
+    'etl': 1.0,
+    'load-only': 1.0,
+    'olap': 0.05,
+    'cluster': 2.5,
+    'cluster --warehouse': 2.5,
+    'classify': 1.0,
+    'classify --warehouse': 2.5,
+    'basket': 1.0,
+    'basket --warehouse': 1.0,
+}
+# Libraries whose presence in sys.modules the budget report lists
+HEAVY_MODULES = ['pandas', 'numpy', 'matplotlib', 'seaborn', 'scipy', 'sklearn', 'mlxtend', 'pyarrow']
+
+def stage_key(args):
+    return args.command + (' --warehouse' if getattr(args, 'warehouse', False) else '')
+
+def import_stage(args):
+    """Import the module of a command; warn when that takes longer than its budget."""
+    key = stage_key(args)
+    start = time.perf_counter()
+    module = importlib.import_module(STAGE_MODULES[key])
+    elapsed = time.perf_counter() - start
+    if elapsed > IMPORT_BUDGETS[key]:
+        print(f"Warning: '{key}' imports took {elapsed:.2f}s (budget {IMPORT_BUDGETS[key]:.2f}s)")
+    return module
+
+def run_etl(args, visualize=True):
+    etl_retail = import_stage(args)
+    return etl_retail.main(args.etl_args, visualize=visualize, prog=f"pipeline.py {args.command}")
+
+def run_olap(args):
+    olap_sql = import_stage(args)
+    olap_sql.print_olap_queries(args.db or olap_sql.DB_FILE, args.match, args.limit)
+
+def run_cluster(args):
+    stage = import_stage(args)
+    if args.warehouse:
+        stage.segment_customers(args.segments, db_file=args.db or stage.DB_FILE)
+    else:
+        stage.perform_clustering(args.workers or os.cpu_count(), args.method, args.sample_size,
+                                 not args.no_plots)
+
+def run_classify(args):
+    stage = import_stage(args)
+    if args.warehouse:
+        X, y = stage.warehouse_customer_features(args.db or stage.DB_FILE)
+        if len(y) == 0:
+            print("No segmented customers found. Run 'pipeline.py cluster --warehouse' first.")
+            return 1
+        results = stage.evaluate_models(stage.default_models(*X.shape), X, y, workers=args.workers)
+        print(results.sort_values('mean', ascending=False)[['model', 'mean', 'std', 'cached']]
+              .round(4).to_string(index=False))
+    else:
+        stage.classification_task(args.workers, not args.no_plots)
+
+def run_basket(args):
+    stage = import_stage(args)
+    if args.warehouse:
+        stage.warehouse_association_rules(min_support=args.min_support, workers=args.workers or os.cpu_count(),
+                                          db_file=args.db or stage.DB_FILE)
+    else:
+        stage.association_rule_mining()
+
+def measure_imports(key, repeat=3):
+    """Best-of-repeat import time of a command's module in a fresh interpreter, and the
+    heavy libraries it pulled in."""
+    import json
+    import subprocess
+    script = (
+        "import importlib, json, sys, time\n"
+        f"sys.path[:0] = {STAGE_DIRS!r}\n"
+        "start = time.perf_counter()\n"
+        f"importlib.import_module({STAGE_MODULES[key]!r})\n"
+        "elapsed = time.perf_counter() - start\n"
+        f"print(json.dumps([elapsed, [m for m in {HEAVY_MODULES!r} if m in sys.modules]]))\n"
+    )
+    env = dict(os.environ, MPLBACKEND='Agg')
+    best, loaded = float('inf'), []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True, env=env)
+        elapsed, loaded = json.loads(out.stdout.strip().splitlines()[-1])
+        best = min(best, elapsed)
+    return best, loaded
+
+def run_budget(args):
+    keys = [key for key in STAGE_MODULES if not args.commands or key.split()[0] in args.commands]
+    if not keys:
+        print(f"No such command: {' '.join(args.commands)}")
+        return 2
+    print(f"{'Command':<21} {'Imports (s)':>11} {'Budget (s)':>10}  Status  Heavy libraries loaded")
+    failed = 0
+    for key in keys:
+        elapsed, loaded = measure_imports(key, args.repeat)
+        ok = elapsed <= IMPORT_BUDGETS[key]
+        failed += not ok
+        print(f"{key:<21} {elapsed:>11.3f} {IMPORT_BUDGETS[key]:>10.2f}  {'ok' if ok else 'OVER':<6}  "
+              f"{', '.join(loaded) or '-'}")
+    return 1 if failed else 0
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='pipeline.py', description="Retail warehouse and data mining pipeline",
+                                     formatter_class=argparse.RawDescriptionHelpFormatter, epilog=__doc__)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    for name, help_text in [('etl', "extract, transform, load, index and chart"),
+                            ('load-only', "extract, transform, load and index; no chart")]:
+        # Every other argument goes to etl_retail.py's own parser (so --help shows its options)
+        commands.add_parser(name, help=help_text, add_help=False)
+
+    olap = commands.add_parser('olap', help="run the bundled OLAP queries and print the results")
+    olap.add_argument('--match', help="only queries whose name contains this, e.g. 3.1.2")
+    olap.add_argument('--limit', type=int, default=20, help="rows printed per query")
+    olap.add_argument('--db')
+
+    cluster = commands.add_parser('cluster', help="K-Means on Iris, or RFM segments of warehouse customers")
+    cluster.add_argument('--warehouse', action='store_true', help="segment CustomerDim (customer_segments.py)")
+    cluster.add_argument('--segments', type=int, default=4, help="with --warehouse")
+    cluster.add_argument('--workers', type=int, default=1, help="elbow k values fitted in parallel (0 = one per CPU)")
+    cluster.add_argument('--method', choices=['kmeans', 'minibatch'], default='kmeans')
+    cluster.add_argument('--sample-size', type=int)
+    cluster.add_argument('--no-plots', action='store_true')
+    cluster.add_argument('--db')
+
+    classify = commands.add_parser('classify', help="Decision Tree vs KNN on Iris, or the model grid on warehouse customers")
+    classify.add_argument('--warehouse', action='store_true', help="predict CustomerDim.segment (model_eval.py)")
+    classify.add_argument('--workers', type=int, default=1, help="cross-validation processes (0 = one per CPU)")
+    classify.add_argument('--no-plots', action='store_true')
+    classify.add_argument('--db')
+
+    basket = commands.add_parser('basket', help="association rules from synthetic or warehouse baskets")
+    basket.add_argument('--warehouse', action='store_true', help="mine the invoices in retail_dw.db")
+    basket.add_argument('--min-support', type=float, default=0.01, help="with --warehouse")
+    basket.add_argument('--workers', type=int, default=1, help="with --warehouse (0 = one per CPU)")
+    basket.add_argument('--db')
+
+    budget = commands.add_parser('budget', help="measure each command's import time against IMPORT_BUDGETS")
+    budget.add_argument('commands', nargs='*', metavar='command', help="commands to measure (default: all)")
+    budget.add_argument('--repeat', type=int, default=3)
+    return parser
+
+COMMANDS = {
+    'etl': run_etl,
+    'load-only': lambda args: run_etl(args, visualize=False),
+    'olap': run_olap,
+    'cluster': run_cluster,
+    'classify': run_classify,
+    'basket': run_basket,
+    'budget': run_budget,
+}
+
+def main(argv=None):
+    parser = build_parser()
+    args, extra = parser.parse_known_args(argv)
+    if args.command in ('etl', 'load-only'):
+        args.etl_args = extra
+    elif extra:
+        parser.error(f"unrecognized arguments: {' '.join(extra)}")
+    # Headless plotting for every stage; stage modules import their packages from these directories
+    os.environ.setdefault('MPLBACKEND', 'Agg')
+    sys.path[:0] = [d for d in STAGE_DIRS if d not in sys.path]
+    return COMMANDS[args.command](args)
+
+if __name__ == "__main__":
+    raise SystemExit(main())